@@ -0,0 +1,106 @@
+"""Usage events: searches, filter toggles, result counts and card impressions.
+
+Recording an event only appends a dict to an in-memory ring buffer. A
+background thread drains the buffer every FLUSH_SECONDS (or sooner once
+FLUSH_BATCH events are waiting) and appends them to a JSONL file, one
+event per line, so a page render never waits on disk. When the buffer is
+full the oldest events are dropped and counted.
+
+Set PATHFINDING_ANALYTICS=0 to turn logging off, and
+PATHFINDING_ANALYTICS_FILE to write somewhere other than usage_events.jsonl.
+Summarize the file with ``python usage_report.py``.
+"""
+
+import atexit
+import json
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+ANALYTICS_ENABLED = os.environ.get("PATHFINDING_ANALYTICS", "1") != "0"
+ANALYTICS_FILE = os.environ.get("PATHFINDING_ANALYTICS_FILE", "usage_events.jsonl")
+BUFFER_SIZE = 10000
+FLUSH_BATCH = 500
+FLUSH_SECONDS = 5.0
+
+
+class EventLog:
+    """Ring buffer of events with a background writer thread."""
+
+    def __init__(
+        self,
+        path: str,
+        size: int = BUFFER_SIZE,
+        batch: int = FLUSH_BATCH,
+        interval: float = FLUSH_SECONDS,
+    ):
+        self.path = path
+        self.batch = batch
+        self.interval = interval
+        self.dropped = 0
+        self._buffer: Deque[Dict[str, Any]] = deque(maxlen=size)
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def record(self, event: str, **fields: Any) -> None:
+        item = {"ts": round(time.time(), 3), "event": event, **fields}
+        with self._lock:
+            if len(self._buffer) == self._buffer.maxlen:
+                self.dropped += 1
+            self._buffer.append(item)
+            pending = len(self._buffer)
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="analytics-flush", daemon=True
+                )
+                self._thread.start()
+        if pending >= self.batch:
+            self._wake.set()
+
+    def _drain(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            items = list(self._buffer)
+            self._buffer.clear()
+        return items
+
+    def flush(self) -> None:
+        """Append everything buffered so far to the log file."""
+        with self._write_lock:
+            items = self._drain()
+            if not items:
+                return
+            lines = "".join(json.dumps(item, ensure_ascii=False) + "\n" for item in items)
+            with open(self.path, "a", encoding="utf-8") as fh:
+                fh.write(lines)
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except OSError:
+                pass  # analytics must never take the app down; this batch is lost
+
+
+_log: Optional[EventLog] = None
+_log_lock = threading.Lock()
+
+
+def event_log() -> EventLog:
+    """The process-wide event log, shared by every session."""
+    global _log
+    with _log_lock:
+        if _log is None:
+            _log = EventLog(ANALYTICS_FILE)
+            atexit.register(_log.flush)
+        return _log
+
+
+def record(event: str, **fields: Any) -> None:
+    if ANALYTICS_ENABLED:
+        event_log().record(event, **fields)
@@ -1,321 +1,103 @@
 import os
 import re
 import html
-from collections import Counter
-from typing import Dict, List, Optional, Tuple, Set
+import time
+import bisect
+import inspect
+import logging
+import threading
+import unicodedata
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import date
+from urllib.parse import parse_qs, urlencode
+from typing import TYPE_CHECKING, Callable, Dict, FrozenSet, List, Optional, Tuple, Set
 
-import numpy as np
-import pandas as pd
 import streamlit as st
-from rapidfuzz import fuzz
-
-UNKNOWN = "Unknown, not stated"
-FUZZY_THR = 60
-
-# Global column map, filled in main()
-COLS: Dict[str, str] = {}
-
-# Page config
-st.set_page_config(
-    page_title="Small Business Supports Finder",
-    page_icon="✅",
-    layout="wide",
-)
-
-
-# ---------------------- STYLING / CHROME ----------------------
-
-
-def embed_css() -> None:
-    st.markdown(
-        """
-<style>
-:root{
-  --bg:#FFFFFF; --surface:#FFFFFF; --text:#0A0A0A; --muted:#4B5563;
-  --primary:#003366; --primary-2:#007FA3; --border:#D9DEE7; --link:#007FA3;
-  --fs-title:24px; --fs-body:15px; --fs-meta:13px;
-}
-
-/* Global text and layout */
-html, body, p, div, span{
-  font-family: system-ui, -apple-system, Segoe UI, Roboto, Helvetica, Arial, "Noto Sans", "Segoe UI Emoji";
-  color:var(--text);
-}
-body{
-  background:#F3F4F6;
-}
-p{ margin:4px 0 4px 0; }
-small{ font-size:var(--fs-meta); }
-
-/* Normalise link colours so visited links do not go purple */
-a:link, a:visited{
-  color:var(--link);
-}
-
-/* Header */
-.goa-header{
-  background:#003366;
-  color:#FFFFFF !important;
-  padding:8px 32px;
-}
-.goa-header-inner{
-  max-width:1200px;
-  margin:0 auto;
-  display:flex;
-  align-items:center;
-  gap:14px;
-}
-.goa-header *{
-  color:#FFFFFF !important;
-}
-.goa-header-logo{
-  height:32px;
-  width:auto;
-}
-.goa-header-title{
-  font-size:20px;
-  font-weight:600;
-  margin:0 0 2px 0;
-}
-.goa-header-subtitle{
-  margin:0;
-  font-size:14px;
-  opacity:.9;
-}
-
-/* App shell */
-.app-shell{
-  padding:18px 32px 32px 32px;
-  background:#F3F4F6;
-}
-.block-container{
-  padding-top:0 !important;
-}
+from streamlit.runtime.scriptrunner import get_script_run_ctx
 
-/* Program cards (GoA blue box) */
-.pf-card{
-  border-radius:12px;
-  border:1px solid #003366;
-  padding:16px 18px 14px 18px;
-  background:#E6EFF7;
-  margin:10px 0 16px 0;
-  box-shadow:0 1px 3px rgba(15,23,42,0.10);
-}
-.pf-card:hover{
-  box-shadow:0 4px 10px rgba(15,23,42,0.18);
-}
-.badge{
-  display:inline-flex;
-  align-items:center;
-  padding:2px 8px;
-  border-radius:999px;
-  font-size:var(--fs-meta);
-  font-weight:500;
-  margin-right:8px;
-}
-.badge-open{
-  background:#DCFCE7;
-  color:#166534;
-}
-.badge-closed{
-  background:#FEE2E2;
-  color:#B91C1C;
-}
-.badge-paused{
-  background:#FEF3C7;
-  color:#92400E;
-}
-.meta{
-  font-size:var(--fs-meta);
-  color:#111827;
-}
-h3.program-title{
-  font-size:18px;
-  margin:6px 0 2px 0;
-}
-.program-org{
-  font-size:var(--fs-body);
-  color:#1F2933;
-  margin-bottom:6px;
-}
-.program-desc{
-  font-size:var(--fs-body);
-  color:#111827;
-}
-.meta-strip{
-  display:flex;
-  flex-wrap:wrap;
-  gap:12px;
-  margin-top:6px;
-  margin-bottom:6px;
-}
-.meta-strip .kv{
-  font-size:var(--fs-meta);
-  color:#111827;
-}
-.placeholder{
-  font-size:var(--fs-meta);
-  color:#6B7280;
-  font-style:italic;
-}
-.results-summary{
-  font-size:var(--fs-meta);
-  color:#4B5563;
-}
-
-/* Actions row inside card */
-.pf-actions{
-  margin-top:8px;
-  display:flex;
-  flex-wrap:wrap;
-  gap:18px;
-  font-size:var(--fs-body);
-}
-.pf-actions a{
-  color:#007FA3;
-  text-decoration:underline;
-}
-.pf-action-muted{
-  color:#6B7280;
-}
-
-/* Accessibility skip link */
-.skip-link {
-  position:absolute; left:-9999px; top:auto; width:1px; height:1px; overflow:hidden;
-}
-.skip-link:focus {
-  position:fixed; left:16px; top:12px; width:auto; height:auto; padding:8px 10px;
-  background:#fff; color:#000; border:2px solid #000; z-index:9999;
-}
-
-/* Sidebar sections and pills */
-.sidebar-section{
-  margin-top:6px;
-}
-.sidebar-section h3{
-  font-size:15px;
-  font-weight:600;
-  margin:0 0 4px 0;
-}
-.sidebar-section small{
-  color:#6B7280;
-  font-size:12px;
-}
-
-/* Help text for individual pills */
-.pill-def{
-  font-size:12px;
-  color:#6B7280;
-  margin:0 0 4px 4px;
-}
+import shell
+import tenants
 
-/* Base button font reset */
-.stButton > button{
-  font-size:13px;
-}
+# Paint the page chrome before the heavy imports below, so a cold start
+# shows the header while pandas and NumPy load. Tools that import app
+# skip it.
+if __name__ == "__main__":
+    shell.paint()
 
-/* Sidebar filter pills (single-column) */
-div[data-testid="stSidebar"] .stButton > button{
-  font-size:13px !important;
-  padding:8px 10px;
-  margin:4px 0 0 0;
-  border-radius:12px;
-  border:1px solid #D1D5DB;
-  background:#F9FAFB;
-  color:#111827;
-  white-space:normal;
-  width:100%;
-  text-align:left;
-  min-height:40px;
-}
-div[data-testid="stSidebar"] .stButton > button:hover{
-  border-color:#9CA3AF;
-  background:#F3F4F6;
-}
-div[data-testid="stSidebar"] .stButton > button:focus{
-  outline:2px solid #2563EB;
-}
+import numpy as np
+import pandas as pd
+from rapidfuzz import fuzz, process
 
-/* Active filter chips under search bar */
-.chips-row{
-  display:flex;
-  flex-wrap:wrap;
-  gap:6px;
-  margin-top:4px;
-}
-.chips-row .stButton > button{
-  font-size:11px;
-  padding:4px 12px;
-  margin:2px 4px 0 0;
-  border-radius:999px;
-  border:1px solid #BFDBFE;
-  background:#DBEAFE;
-  color:#1D4ED8;
-  text-align:left;
-}
-.chips-row .stButton > button:hover{
-  background:#BFDBFE;
-}
+import favourites
+import profiling
 
-/* Links inside cards */
-.pf-card a{
-  color:#007FA3;
-  text-decoration:underline;
-}
-.pf-card a:hover{
-  opacity:.85;
-}
+if TYPE_CHECKING:
+    # Imported where used, only with the SQLite backend
+    import sqlite_backend
 
-/* Search bar – darker border */
-div[data-testid="stTextInput"] input{
-  border:2px solid #9CA3AF !important;
-  border-radius:999px !important;
-}
+UNKNOWN = "Unknown, not stated"
+FUZZY_THR = 60
 
-/* Make section headings slightly larger than pills in sidebar */
-div[data-testid="stSidebar"] h2, 
-div[data-testid="stSidebar"] h3{
-  font-size:15px !important;
+FUNDING_BUCKETS = [
+    "Under 5K",
+    "5K to 25K",
+    "25K to 100K",
+    "100K to 500K",
+    "Over 500K",
+    UNKNOWN,
+]
+FUNDING_TYPES = [
+    "Grant",
+    "Loan",
+    "Tax Credit",
+    "Voucher or Rebate",
+    "Equity or Investment",
+    "Other Financing",
+]
+FILTER_KEYS = [
+    "filter_support",
+    "filter_funding_type",
+    "filter_funding_bucket",
+    "filter_audience",
+    "filter_region",
+    "filter_stage",
+    "filter_funding_min",
+]
+SORT_OPTIONS = {
+    "relevance": "Relevance",
+    "name": "Program name A to Z",
+    "checked": "Most recently checked",
+    "funding": "Highest funding first",
 }
-
-/* Funding bands – keep consistent style */
-.funding-band-label{
-  font-style:normal;
+PER_PAGE_OPTIONS = [10, 25, 50]
+STATUS_BADGES = {
+    "Operational": "badge-open",
+    "Closed": "badge-closed",
+    "Paused": "badge-paused",
 }
-</style>
-        """,
-        unsafe_allow_html=True,
-    )
-
 
-def embed_logo_html() -> None:
-    # Uses SVG from your repo; adjust if you change the path.
-    logo_url = (
-        "https://raw.githubusercontent.com/McFusion210/pathfinding-app/main/assets/GoA-logo.svg"
-    )
-    st.markdown(
-        f"""
-<a href="#main" class="skip-link">Skip to main content</a>
-<div class="goa-header">
-  <div class="goa-header-inner">
-    <img src="{logo_url}" alt="Government of Alberta" class="goa-header-logo" />
-    <div>
-      <div class="goa-header-title">Small Business Supports Finder</div>
-      <div class="goa-header-subtitle">
-        Helping Alberta entrepreneurs and small businesses find programs, funding, and services quickly.
-      </div>
-    </div>
-  </div>
-</div>
-<div id="main" class="app-shell">
-""",
-        unsafe_allow_html=True,
-    )
+# Search-as-you-type: commit the query after this typing pause, ignore
+# queries shorter than MIN_QUERY_LEN and score the catalogue in chunks so a
+# superseded query can be abandoned part way through.
+SEARCH_DEBOUNCE = "400ms"
+MIN_QUERY_LEN = 2
+SCORE_CHUNK = 256
+ADMIN_MODE = os.environ.get("PATHFINDING_ADMIN", "") == "1"
 
+# Storage: "memory" keeps the enriched frame in each process; "sqlite" keeps
+# it in a shared on-disk database (PATHFINDING_DB, default next to the
+# workbook) and only a slim frame in memory.
+STORAGE_BACKEND = os.environ.get("PATHFINDING_BACKEND", "memory")
+SQLITE_DB = os.environ.get("PATHFINDING_DB") or None
+LIVE_SEARCH_SUPPORTED = "live" in inspect.signature(st.text_input).parameters
 
-def close_shell() -> None:
-    st.markdown("</div>", unsafe_allow_html=True)
+# While the catalogue loads in the background, rerun this often to check on it
+CATALOGUE_POLL_SECONDS = 0.2
 
+# Global column map, filled in main()
+COLS: Dict[str, str] = {}
 
 # ---------------------- TEXT UTILITIES ----------------------
 
@@ -343,6 +125,20 @@ def sanitize_text_keep_smart(s: str) -> str:
     return s
 
 
+def fold_text(s: str) -> str:
+    """Accent- and case-insensitive form of a string ("Métis" -> "metis")."""
+    decomposed = unicodedata.normalize("NFKD", s or "")
+    stripped = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return stripped.casefold()
+
+
+def collation_key(s) -> str:
+    """Sort key for display names: cleaned, accent-folded and case-folded."""
+    if s is None or (isinstance(s, float) and pd.isna(s)):
+        return ""
+    return fold_text(sanitize_text_keep_smart(str(s)))
+
+
 def truncate_for_card(text: str, limit: int = 260) -> str:
     text = sanitize_text_keep_smart(text or "")
     if len(text) <= limit:
@@ -378,65 +174,135 @@ def parse_tags_field_clean(val) -> List[str]:
     return out
 
 
-def days_since(value) -> Tuple[Optional[int], Optional[str]]:
-    if not value:
-        return None, None
-    try:
-        d = pd.to_datetime(value)
-    except Exception:
-        return None, None
-    delta = (pd.Timestamp("today").normalize() - d.normalize()).days
-    return int(delta), d.date().isoformat()
+FRESH_RECENT_DAYS = 90
+FRESH_STALE_DAYS = 365
+
+
+def parse_checked_dates(values: pd.Series) -> pd.Series:
+    """Parse Last Checked values once into datetime64 days (NaT if unparseable)."""
+    parsed = pd.to_datetime(values, errors="coerce", format="mixed")
+    return parsed.dt.normalize()
+
+
+def freshness_days(checked: pd.Series, today: date) -> pd.Series:
+    """Whole days between each check date and ``today`` (NA when unknown)."""
+    return (pd.Timestamp(today) - checked).dt.days.astype("Int32")
 
 
-def freshness_label(days: Optional[int]) -> str:
-    if days is None:
-        return "Last checked date not available"
-    if days <= 90:
-        return f"{days} days ago (recent)"
-    if days <= 365:
-        return f"{days} days ago"
-    return f"{days} days ago (may be out of date)"
+def freshness_labels(days: pd.Series) -> pd.Series:
+    """Card freshness text for every row, built in one vectorized pass."""
+    known = days.notna().to_numpy()
+    d = days.fillna(0).to_numpy()
+    suffix = np.select(
+        [d <= FRESH_RECENT_DAYS, d <= FRESH_STALE_DAYS],
+        [" (recent)", ""],
+        default=" (may be out of date)",
+    )
+    labels = pd.Series(d.astype(str), index=days.index) + " days ago" + suffix
+    return labels.where(known, "Last checked date not available")
+
+
+def status_badge(status) -> str:
+    s = str(status or "").lower()
+    if "closed" in s:
+        return "Closed"
+    if "paused" in s:
+        return "Paused"
+    return "Operational"
 
 
 # ---------------------- FUNDING & CONTACT LOGIC ----------------------
 
 
-def funding_bucket(text: str) -> str:
-    """Safe bucketer for Funding Amount."""
-    if text is None or (isinstance(text, float) and pd.isna(text)):
-        return UNKNOWN
+FUNDING_BAND_LIMITS = [5000, 25000, 100000, 500000]
 
-    s = sanitize_text_keep_smart(str(text))
+AMOUNT_RE = re.compile(
+    r"(?P<dollar>\$)?\s*"
+    r"(?P<num>\d{1,3}(?:,\d{3})+(?:\.\d+)?|\d+(?:\.\d+)?)"
+    r"(?:\s*(?P<unit>thousand|million|billion|k|m|b)\b)?"
+    r"(?P<pct>\s*%)?",
+    re.IGNORECASE,
+)
+AMOUNT_UNITS = {"k": 1e3, "thousand": 1e3, "m": 1e6, "million": 1e6, "b": 1e9, "billion": 1e9}
+# "30% of eligible costs"; the workbook export has lost most "%" signs
+PERCENT_OF_COST_RE = re.compile(
+    r"^\s*(?:%\s*)?of\s+(?:the\s+)?(?:eligible\s+|project\s+|total\s+)?(?:costs?|expenses?)",
+    re.IGNORECASE,
+)
+RANGE_GAP_RE = re.compile(r"^\s*(?:-|–|—|to|and)?\s*\$?\s*$", re.IGNORECASE)
+CAP_RE = re.compile(
+    r"(?:up to|max(?:imum)?(?:\s+of)?|cap(?:ped)?(?:\s+(?:at|of))?|no more than|limit of)\W*$",
+    re.IGNORECASE,
+)
+PER_YEAR_RE = re.compile(r"per (?:year|annum)|/\s*(?:year|yr)\b|\bannual(?:ly)?\b|\ba year\b", re.IGNORECASE)
 
-    matches = re.findall(r"\$?\s*([\d,]+)", s)
-    nums: List[int] = []
 
-    for p in matches:
-        digit_groups = re.findall(r"\d+", p)
-        if not digit_groups:
-            continue
-        num_str = "".join(digit_groups)
-        if not num_str:
-            continue
-        try:
-            nums.append(int(num_str))
-        except ValueError:
+@dataclass
+class FundingTerms:
+    """Amounts parsed from one Funding Amount cell (NaN when not stated)."""
+
+    min: float = np.nan
+    max: float = np.nan
+    pct: float = np.nan
+    per_year: bool = False
+    currency: str = ""
+
+
+def parse_funding(text) -> FundingTerms:
+    """Minimum and maximum amounts, percent of costs, period and currency.
+
+    Handles "up to $50,000", "$1,000 - $25,000 per year", "2.5 million",
+    "30% of eligible costs" and the ranges whose dash was lost in the
+    workbook export ("1,00025,000" is 1,000 to 25,000).
+    """
+    terms = FundingTerms()
+    if text is None or (isinstance(text, float) and pd.isna(text)):
+        return terms
+    s = sanitize_text_keep_smart(str(text))
+
+    amounts: List[Tuple[float, int, int]] = []
+    for m in AMOUNT_RE.finditer(s):
+        num = m.group("num")
+        value = float(num.replace(",", ""))
+        unit = (m.group("unit") or "").lower()
+        if m.group("pct") or (
+            not m.group("dollar") and not unit and value <= 100
+            and PERCENT_OF_COST_RE.match(s[m.end() :])
+        ):
+            terms.pct = value if np.isnan(terms.pct) else max(terms.pct, value)
             continue
+        value *= AMOUNT_UNITS.get(unit, 1)
+        is_money = bool(m.group("dollar") or unit or "," in num or value >= 1000)
+        is_year = not m.group("dollar") and "," not in num and 1900 <= value <= 2099
+        if is_money and not is_year:
+            amounts.append((value, m.start("num"), m.end()))
+
+    if not amounts:
+        return terms
+
+    terms.max = max(v for v, _start, _end in amounts)
+    for (lo, _s1, end), (hi, start, _e2) in zip(amounts, amounts[1:]):
+        if lo < hi and RANGE_GAP_RE.match(s[end:start]):
+            terms.min = lo
+            break
+    else:
+        if len(amounts) == 1 and not CAP_RE.search(s[: amounts[0][1]]):
+            terms.min = terms.max
+
+    terms.per_year = bool(PER_YEAR_RE.search(s))
+    terms.currency = "USD" if re.search(r"\bUSD\b|US\$", s) else "CAD"
+    return terms
 
-    if not nums:
+
+def funding_band(amount: float) -> str:
+    if amount is None or np.isnan(amount):
         return UNKNOWN
+    return FUNDING_BUCKETS[bisect.bisect_right(FUNDING_BAND_LIMITS, amount)]
+
 
-    mx = max(nums)
-    if mx < 5000:
-        return "Under 5K"
-    if mx < 25000:
-        return "5K to 25K"
-    if mx < 100000:
-        return "25K to 100K"
-    if mx < 500000:
-        return "100K to 500K"
-    return "Over 500K"
+def funding_bucket(text: str) -> str:
+    """Funding band of the largest amount in a Funding Amount cell."""
+    return funding_band(parse_funding(text).max)
 
 
 def add_dollar_signs(bucket: str) -> str:
@@ -474,7 +340,7 @@ def normalize_phone(phone: str) -> Tuple[str, str]:
 def format_phone_multi(phone: str) -> str:
     if not phone:
         return ""
-    chunks = re.split(r"[,/;]|\bor\b", str(phone))
+    chunks = re.split(r"[,/;|]|\bor\b", str(phone))
     parts = []
     for ch in chunks:
         ch = ch.strip()
@@ -509,6 +375,37 @@ def parse_email_field(raw: str) -> Tuple[str, str]:
     return s, ""
 
 
+PLACEHOLDER_VALUES = {"nan", "none", "na", "n/a", "not available", "not listed", "no phone"}
+PHONE_DISPLAY = re.compile(r"^\d{3}-\d{3}-\d{4}$")
+
+
+def clean_cell(val) -> str:
+    if val is None or (isinstance(val, float) and pd.isna(val)):
+        return ""
+    return str(val).strip()
+
+
+def canonical_phone(raw: str) -> str:
+    """Display form of a phone field, or "" for placeholders."""
+    lower = raw.lower()
+    if lower in PLACEHOLDER_VALUES:
+        return ""
+    if "not publicly listed" in lower and "contact page" in lower:
+        return ""
+    return format_phone_multi(raw)
+
+
+def canonical_url(raw: str) -> str:
+    """Absolute http(s) URL for a website field, or "" if it is not usable."""
+    if not raw or raw.lower() in PLACEHOLDER_VALUES:
+        return ""
+    url = raw if raw.startswith(("http://", "https://")) else f"https://{raw}"
+    host = url.split("://", 1)[1].split("/", 1)[0]
+    if " " in url or "." not in host or host.lower().endswith(".nan"):
+        return ""
+    return url
+
+
 # ---------------------- COLUMN INFERENCE ----------------------
 
 
@@ -557,69 +454,72 @@ def infer_columns(df: pd.DataFrame) -> Dict[str, str]:
 
 # ---------------------- CATEGORY CLASSIFIERS ----------------------
 
+# Keyword groups behind the classifiers; search also compiles its synonym
+# table from them (see build_synonyms).
+SUPPORT_KEYWORDS: Dict[str, List[str]] = {
+    "Funding and Financial Supports": [
+        "grant",
+        "loan",
+        "flexloan",
+        "microloan",
+        "micro-loan",
+        "fund",
+        "financing",
+        "capital",
+        "tax",
+        "credit",
+        "equity",
+        "voucher",
+        "rebate",
+    ],
+    "Advisory, Coaching, and Mentorship": [
+        "advisory",
+        "consulting",
+        "coaching",
+        "mentor",
+        "mentorship",
+    ],
+    "Training and Workshops": [
+        "training",
+        "workshop",
+        "workshops",
+        "course",
+        "bootcamp",
+        "learning",
+        "education",
+    ],
+    "Networking and Peer Support": ["networking", "community", "peer", "association", "event"],
+    "Accelerators, Incubators, and Cohorts": [
+        "accelerator",
+        "incubator",
+        "pre-accelerator",
+        "cohort",
+    ],
+    "Export and Market Access": ["export", "market", "canexport", "international"],
+    "Innovation, R&D, and Technology": ["innovation", "r&d", "research", "technology", "ip"],
+}
+FUNDING_SUPPORT = "Funding and Financial Supports"
+
+FUNDING_TYPE_KEYWORDS: Dict[str, List[str]] = {
+    "Grant": ["grant"],
+    "Loan": ["loan", "microloan", "micro-loan", "flexloan"],
+    "Voucher or Rebate": ["voucher", "rebate"],
+    "Equity or Investment": ["equity", "investment"],
+}
+
 
 def classify_support(tags: List[str], funding_amount) -> List[str]:
     """High level support categories derived from Meta Tags and funding info."""
     lower = "; ".join(tags).lower()
     cats: Set[str] = set()
 
-    has_funding_text = any(
-        k in lower
-        for k in [
-            "grant",
-            "loan",
-            "flexloan",
-            "microloan",
-            "micro-loan",
-            "fund",
-            "financing",
-            "capital",
-            "tax",
-            "credit",
-            "equity",
-            "voucher",
-            "rebate",
-        ]
-    )
     has_funding_amount = isinstance(funding_amount, str) and funding_amount.strip()
+    if has_funding_amount:
+        cats.add(FUNDING_SUPPORT)
 
-    if has_funding_text or has_funding_amount:
-        cats.add("Funding and Financial Supports")
-
-    if any(
-        k in lower
-        for k in ["advisory", "consulting", "coaching", "mentor", "mentorship"]
-    ):
-        cats.add("Advisory, Coaching, and Mentorship")
-
-    if any(
-        k in lower
-        for k in [
-            "training",
-            "workshop",
-            "workshops",
-            "course",
-            "bootcamp",
-            "learning",
-            "education",
-        ]
-    ):
-        cats.add("Training and Workshops")
-
-    if any(
-        k in lower
-        for k in ["networking", "community", "peer", "association", "event"]
-    ):
-        cats.add("Networking and Peer Support")
-
-    if any(k in lower for k in ["accelerator", "incubator", "pre-accelerator", "cohort"]):
-        cats.add("Accelerators, Incubators, and Cohorts")
-
-    if any(k in lower for k in ["export", "market", "canexport", "international"]):
-        cats.add("Export and Market Access")
-
-    if any(k in lower for k in ["innovation", "r&d", "research", "technology", "ip"]):
-        cats.add("Innovation, R&D, and Technology")
+    for cat, keywords in SUPPORT_KEYWORDS.items():
+        if any(k in lower for k in keywords):
+            cats.add(cat)
 
     if not cats:
         cats.add("General Business Supports")
@@ -675,94 +575,111 @@ def classify_stage(tags: List[str]) -> List[str]:
     return sorted(cats)
 
 
-def classify_region(raw) -> List[str]:
-    """Region categories for sidebar pills with GoA-friendly labels."""
-    if not isinstance(raw, str):
-        return ["Location Not Specified"]
-    s = raw.lower().strip()
-    cats: Set[str] = set()
+# Region hierarchy: each region's parent, up to Canada
+REGION_PARENTS: Dict[str, Optional[str]] = {
+    "Canada": None,
+    "Alberta-wide": "Canada",
+    "Northern Alberta": "Alberta-wide",
+    "Central Alberta": "Alberta-wide",
+    "Southern Alberta": "Alberta-wide",
+    "Rural Alberta": "Alberta-wide",
+    "Calgary": "Alberta-wide",
+    "Edmonton": "Alberta-wide",
+}
+OTHER_REGION = "Other Location"
+
+# Municipalities and place words found in the Region column, by region
+GAZETTEER_REGIONS: Dict[str, List[str]] = {
+    "Canada": ["canada", "canada-wide", "national", "international"],
+    "Alberta-wide": ["alberta", "alberta-wide", "ab"],
+    "Northern Alberta": [
+        "northern", "northern alberta", "fort mcmurray", "wood buffalo", "grande prairie",
+        "grand prairie", "peace river", "high level", "slave lake", "cold lake",
+        "lac la biche", "athabasca", "bonnyville", "whitecourt", "edson", "hinton",
+    ],
+    "Central Alberta": [
+        "central", "central alberta", "red deer", "rocky mountain house", "camrose",
+        "wetaskiwin", "lacombe", "ponoka", "olds", "sylvan lake", "stettler", "drumheller",
+    ],
+    "Southern Alberta": [
+        "southern", "southern alberta", "lethbridge", "medicine hat", "brooks", "taber",
+        "cardston", "pincher creek", "crowsnest pass", "claresholm", "siksika",
+    ],
+    "Rural Alberta": ["rural", "rural alberta"],
+    "Calgary": [
+        "calgary", "greater calgary", "airdrie", "cochrane", "chestermere", "okotoks",
+        "high river",
+    ],
+    "Edmonton": [
+        "edmonton", "greater edmonton", "st albert", "sherwood park", "strathcona county",
+        "spruce grove", "leduc", "fort saskatchewan", "stony plain",
+    ],
+}
 
-    # Canada (including export & international)
-    if "canada" in s:
-        cats.add("Canada")
-
-    # City-specific
-    if "calgary" in s:
-        cats.add("Calgary")
-    if "edmonton" in s:
-        cats.add("Edmonton")
-
-    # Rural and Siksika
-    is_rural = "rural" in s or "siksika" in s
-
-    # Simple markers for north / central / south
-    northern_markers = [
-        "fort mcmurray",
-        "fort mcmurray wood buffalo",
-        "wood buffalo",
-        "grand prairie",
-        "grande prairie",
-        "peace river",
-        "high level",
-        "slave lake",
-        "northern",
-    ]
-    central_markers = [
-        "red deer",
-        "central",
-        "rocky mountain house",
-        "camrose",
-        "wetaskiwin",
-    ]
-    southern_markers = [
-        "lethbridge",
-        "medicine hat",
-        "brooks",
-        "taber",
-        "cardston",
-        "southern",
-        "siksika",
-    ]
 
-    if any(m in s for m in northern_markers):
-        cats.add("Northern Alberta")
-    if any(m in s for m in central_markers):
-        cats.add("Central Alberta")
-    if any(m in s for m in southern_markers):
-        cats.add("Southern Alberta")
+def region_ancestors(region: str) -> FrozenSet[str]:
+    """Every region above ``region`` in the hierarchy ("Calgary" -> Alberta-wide, Canada)."""
+    found: Set[str] = set()
+    parent = REGION_PARENTS.get(region)
+    while parent is not None:
+        found.add(parent)
+        parent = REGION_PARENTS.get(parent)
+    return frozenset(found)
 
-    if is_rural:
-        cats.add("Rural Alberta")
 
-    # Alberta-wide
-    if s == "alberta" or "alberta-wide" in s:
-        cats.add("Alberta-wide")
+# Built once at import: folded place name -> region, region -> ancestors
+GAZETTEER: Dict[str, str] = {
+    place: region for region, places in GAZETTEER_REGIONS.items() for place in places
+}
+GAZETTEER_MAX_WORDS = max(len(place.split()) for place in GAZETTEER)
+REGION_ANCESTORS: Dict[str, FrozenSet[str]] = {r: region_ancestors(r) for r in REGION_PARENTS}
+BROAD_REGIONS: FrozenSet[str] = frozenset().union(*REGION_ANCESTORS.values())
 
-    # If nothing matched but Alberta is mentioned, default to Alberta-wide
-    if not cats and "alberta" in s:
-        cats.add("Alberta-wide")
 
-    # Fallback to original text if absolutely nothing matched
-    if not cats:
-        cats.add(raw)
+def expand_regions(regions: List[str]) -> List[str]:
+    """Selected regions plus the regions above them.
 
-    return sorted(cats)
+    Programs offered Alberta-wide or across Canada are open to a business
+    in Calgary, so selecting "Calgary" also matches them.
+    """
+    expanded = set(regions)
+    for r in regions:
+        expanded |= REGION_ANCESTORS.get(r, frozenset())
+    return sorted(expanded)
+
+
+def classify_region(raw) -> List[str]:
+    """Region categories for sidebar pills with GoA-friendly labels.
+
+    Every run of up to ``GAZETTEER_MAX_WORDS`` words is looked up in the
+    gazetteer, and a region is dropped when a more specific one was found
+    ("Edmonton, Alberta" is Edmonton only). Text naming no known place is
+    grouped under one "Other Location" pill.
+    """
+    if not isinstance(raw, str) or not raw.strip():
+        return ["Location Not Specified"]
+    words = re.findall(r"[a-z0-9]+(?:-[a-z0-9]+)*", fold_text(raw))
+    cats: Set[str] = set()
+    for size in range(1, GAZETTEER_MAX_WORDS + 1):
+        for i in range(len(words) - size + 1):
+            region = GAZETTEER.get(" ".join(words[i : i + size]))
+            if region is not None:
+                cats.add(region)
+    if not cats:
+        return [OTHER_REGION]
+    covered = set().union(*(REGION_ANCESTORS[r] for r in cats))
+    return sorted(cats - covered)
 
 
 def derive_funding_types_from_tags(tags: List[str]) -> Set[str]:
     types: Set[str] = set()
     for tag in tags:
         t = tag.lower()
-        if "grant" in t:
-            types.add("Grant")
-        if any(x in t for x in ["loan", "microloan", "micro-loan", "flexloan"]):
-            types.add("Loan")
+        for ftype, keywords in FUNDING_TYPE_KEYWORDS.items():
+            if any(x in t for x in keywords):
+                types.add(ftype)
         if "tax credit" in t or (("tax" in t) and ("credit" in t)):
             types.add("Tax Credit")
-        if "voucher" in t or "rebate" in t:
-            types.add("Voucher or Rebate")
-        if "equity" in t or "investment" in t:
-            types.add("Equity or Investment")
         if "financing" in t and not types:
             types.add("Other Financing")
     return types
@@ -804,17 +721,31 @@ def load_data(path: str) -> Tuple[pd.DataFrame, Dict[str, str]]:
             df[col_name] = ""
             col_map[key] = col_name
 
-    # Derived funding bucket
-    df["__funding_bucket"] = df[col_map["FUNDING"]].apply(funding_bucket)
+    df = df.reset_index(drop=True)
+
+    # Structured funding terms, parsed once per distinct cell; the band
+    # comes from the parsed maximum
+    funding = df[col_map["FUNDING"]]
+    parsed = {t: parse_funding(t) for t in funding.dropna().unique()}
+    terms = [FundingTerms() if pd.isna(t) else parsed[t] for t in funding]
+    df["__funding_min"] = np.array([t.min for t in terms], dtype=np.float64)
+    df["__funding_max"] = np.array([t.max for t in terms], dtype=np.float64)
+    df["__funding_pct"] = np.array([t.pct for t in terms], dtype=np.float64)
+    df["__funding_per_year"] = [t.per_year for t in terms]
+    df["__funding_currency"] = pd.Categorical([t.currency for t in terms])
+
+    # Derived funding bucket and status badge
+    df["__funding_bucket"] = pd.Categorical(
+        [funding_band(t.max) for t in terms], categories=FUNDING_BUCKETS
+    )
+    df["__status_badge"] = pd.Categorical(
+        df[col_map["STATUS"]].apply(status_badge), categories=list(STATUS_BADGES)
+    )
+
+    # Last checked date; day counts are derived per request date
+    df["__checked"] = parse_checked_dates(df[col_map["LAST_CHECKED"]])
 
-    # Last checked metrics
-    days_list, date_list = [], []
-    for val in df[col_map["LAST_CHECKED"]].tolist():
-        d, ds = days_since(val)
-        days_list.append(d)
-        date_list.append(ds or "")
-    df["__fresh_days"] = days_list
-    df["__fresh_date"] = date_list
+    normalize_contacts(df, col_map)
 
     # Stable key
     if df[col_map["KEY"]].isna().any():
@@ -827,186 +758,1440 @@ def load_data(path: str) -> Tuple[pd.DataFrame, Dict[str, str]]:
             + df.index.astype(str)
         )
 
-    # Meta tags list
-    df["__tags_list"] = df[col_map["META_TAGS"]].apply(parse_tags_field_clean)
+    return df, col_map
 
-    # High level support categories, audience, region, and stage
-    df["__support_cats"] = [
-        classify_support(tags, fa)
-        for tags, fa in zip(df["__tags_list"], df[col_map["FUNDING"]])
-    ]
-    df["__audience_cats"] = df["__tags_list"].apply(classify_audience)
-    df["__region_cats"] = df[col_map["REGION"]].apply(classify_region)
-    df["__stage_cats"] = df["__tags_list"].apply(classify_stage)
 
-    # Funding type set
-    df["__fund_type_set"] = df["__tags_list"].apply(derive_funding_types_from_tags)
+# ---------------------- AUTOCOMPLETE INDEX ----------------------
 
-    return df, col_map
+SUGGEST_KINDS = ["Program", "Organization", "Tag"]
+SUGGEST_LIMIT = 8
+SUGGEST_SCAN = 200
 
 
-# ---------------------- SEARCH & FILTER LOGIC ----------------------
+@dataclass
+class PrefixIndex:
+    """Sorted word-prefix array over program names, organizations and tags.
 
+    Every word start of every term is stored as a key, so "loan" finds
+    "Alberta Loan Program" as well as "Loan Guarantee". A lookup is two
+    binary searches plus a bounded walk over the matching range.
+    """
+
+    keys: List[str] = field(default_factory=list)
+    term_ids: List[int] = field(default_factory=list)
+    at_start: List[bool] = field(default_factory=list)
+    terms: List[Tuple[str, str]] = field(default_factory=list)
+
+    def lookup(self, prefix: str, limit: int = SUGGEST_LIMIT) -> List[Tuple[str, str]]:
+        p = prefix.strip().casefold()
+        if not p:
+            return []
+        lo = bisect.bisect_left(self.keys, p)
+        hi = bisect.bisect_left(self.keys, p + "\U0010ffff")
+
+        best: Dict[int, bool] = {}
+        for i in range(lo, min(hi, lo + SUGGEST_SCAN)):
+            tid = self.term_ids[i]
+            best[tid] = best.get(tid, False) or self.at_start[i]
+
+        ranked = sorted(
+            best,
+            key=lambda tid: (
+                not best[tid],
+                SUGGEST_KINDS.index(self.terms[tid][1]),
+                self.terms[tid][0].casefold(),
+            ),
+        )
+        return [self.terms[tid] for tid in ranked[:limit]]
+
+
+def build_prefix_index(df: pd.DataFrame, col_map: Dict[str, str]) -> PrefixIndex:
+    seen: Dict[Tuple[str, str], int] = {}
+    terms: List[Tuple[str, str]] = []
+
+    def add_term(text: str, kind: str) -> None:
+        text = sanitize_text_keep_smart(text)
+        if not text or (text.casefold(), kind) in seen:
+            return
+        seen[(text.casefold(), kind)] = len(terms)
+        terms.append((text, kind))
+
+    for val in df[col_map["PROGRAM_NAME"]].dropna():
+        add_term(str(val), "Program")
+    for val in df[col_map["ORGANIZATION"]].dropna():
+        add_term(str(val), "Organization")
+    for val in df[col_map["META_TAGS"]]:
+        for tag in parse_tags_field_clean(val):
+            add_term(tag, "Tag")
+
+    entries: List[Tuple[str, int, bool]] = []
+    for tid, (text, _kind) in enumerate(terms):
+        folded = text.casefold()
+        for m in re.finditer(r"\w", folded):
+            pos = m.start()
+            if pos == 0 or not folded[pos - 1].isalnum():
+                entries.append((folded[pos:], tid, pos == 0))
+    entries.sort()
+
+    return PrefixIndex(
+        keys=[e[0] for e in entries],
+        term_ids=[e[1] for e in entries],
+        at_start=[e[2] for e in entries],
+        terms=terms,
+    )
 
-def fuzzy_mask(df: pd.DataFrame, query: str, threshold: int = FUZZY_THR) -> pd.Series:
-    if not query:
-        return pd.Series(True, index=df.index)
-    q = sanitize_text_keep_smart(query).lower()
-    if not q:
-        return pd.Series(True, index=df.index)
 
-    fields = [
-        COLS["PROGRAM_NAME"],
-        COLS["ORGANIZATION"],
-        COLS["DESCRIPTION"],
-        COLS["ELIGIBILITY"],
+def apply_suggestion(text: str) -> None:
+    st.session_state["search_q"] = text
+
+
+def render_suggestions(index: PrefixIndex) -> None:
+    """Typeahead buttons under the search box for the committed query."""
+    q = sanitize_text_keep_smart(st.session_state.get("search_q", ""))
+    if len(q) < MIN_QUERY_LEN:
+        return
+    suggestions = [
+        (text, kind)
+        for text, kind in index.lookup(q)
+        if text.casefold() != q.casefold()
     ]
-    scores = []
-    for col in fields:
-        col_vals = df[col].fillna("").astype(str).str.lower().tolist()
-        col_scores = [fuzz.partial_ratio(q, v) for v in col_vals]
-        scores.append(col_scores)
+    if not suggestions:
+        return
 
-    arr = np.array(scores)
-    best = arr.max(axis=0)
-    return pd.Series(best >= threshold, index=df.index)
+    st.markdown("<div class='chips-row'>", unsafe_allow_html=True)
+    num_cols = min(4, len(suggestions))
+    cols = st.columns(num_cols)
+    for i, (text, kind) in enumerate(suggestions):
+        with cols[i % num_cols]:
+            st.button(
+                text,
+                key=f"suggest_{kind}_{i}",
+                help=kind,
+                on_click=apply_suggestion,
+                args=(text,),
+            )
+    st.markdown("</div>", unsafe_allow_html=True)
 
 
-def apply_filters(df: pd.DataFrame) -> Tuple[pd.DataFrame, Dict[str, List[str]]]:
-    q = st.session_state.get("search_q", "")
-    mask = fuzzy_mask(df, q, threshold=FUZZY_THR)
+# ---------------------- INGEST VALIDATION ----------------------
 
-    active_filters: Dict[str, List[str]] = {}
 
-    def multi_select_filter(session_key: str, data_field: str):
-        vals = st.session_state.get(session_key, [])
-        if vals:
-            active_filters[session_key] = vals
+def normalize_contacts(df: pd.DataFrame, col_map: Dict[str, str]) -> None:
+    """Canonical website, email and phone columns, so cards only read clean values."""
+    websites = df[col_map["WEBSITE"]].map(clean_cell)
+    emails = df[col_map["EMAIL"]].map(clean_cell).map(parse_email_field)
+    phones = df[col_map["PHONE"]].map(clean_cell)
 
-            def fn(row):
-                row_tags = row.get(data_field, [])
-                return any(v in row_tags for v in vals)
+    df["__website_url"] = websites.map(canonical_url)
+    df["__email_label"] = pd.Categorical([label for label, _href in emails])
+    df["__email_href"] = [href for _label, href in emails]
+    df["__phone_display"] = phones.map(canonical_phone)
 
-            return df.apply(fn, axis=1)
-        return pd.Series(True, index=df.index)
 
-    mask_support = multi_select_filter("filter_support", "__support_cats")
-    mask_audience = multi_select_filter("filter_audience", "__audience_cats")
-    mask_region = multi_select_filter("filter_region", "__region_cats")
-    mask_stage = multi_select_filter("filter_stage", "__stage_cats")
+def build_quality_report(df: pd.DataFrame, col_map: Dict[str, str]) -> pd.DataFrame:
+    """Row-level data issues found at ingest. ``Row`` is the workbook row number."""
+    issues: List[Tuple[Optional[int], str, str, str, str]] = []
 
-    # Funding amount buckets
-    funding_vals = st.session_state.get("filter_funding_bucket", [])
-    if funding_vals:
-        active_filters["filter_funding_bucket"] = funding_vals
-        mask_funding = df["__funding_bucket"].isin(funding_vals)
-    else:
-        mask_funding = pd.Series(True, index=df.index)
+    def add(pos: Optional[int], field_key: str, issue: str) -> None:
+        if pos is None:
+            issues.append((None, "", "", field_key, issue))
+            return
+        issues.append(
+            (
+                pos + 2,
+                clean_cell(df.iat[pos, key_idx]),
+                clean_cell(df.iat[pos, name_idx]),
+                field_key,
+                issue,
+            )
+        )
 
-    # Funding types (grants, loans, etc.)
-    fund_type_vals = st.session_state.get("filter_funding_type", [])
-    if fund_type_vals:
-        active_filters["filter_funding_type"] = fund_type_vals
+    key_idx = df.columns.get_loc(col_map["KEY"])
+    name_idx = df.columns.get_loc(col_map["PROGRAM_NAME"])
 
-        def ftype(row):
-            tags = row.get("__fund_type_set", set())
-            return any(v in tags for v in fund_type_vals)
+    for key, col_name in col_map.items():
+        if col_name.startswith("__missing_"):
+            add(None, key, "Column not found in workbook")
 
-        mask_ftype = df.apply(ftype, axis=1)
-    else:
-        mask_ftype = pd.Series(True, index=df.index)
-
-    overall = (
-        mask
-        & mask_support
-        & mask_audience
-        & mask_region
-        & mask_stage
-        & mask_funding
-        & mask_ftype
-    )
-    return df[overall].copy(), active_filters
+    keys = df[col_map["KEY"]].map(clean_cell)
+    for pos in np.flatnonzero(keys.duplicated(keep=False) & (keys != "")):
+        add(int(pos), "KEY", f"Duplicate key '{keys.iat[pos]}'")
 
+    funding = df[col_map["FUNDING"]].map(clean_cell)
+    unparsed = funding.str.contains("$", regex=False) & (df["__funding_bucket"] == UNKNOWN)
+    for pos in np.flatnonzero(unparsed.to_numpy()):
+        add(int(pos), "FUNDING", f"Funding amount could not be read: '{funding.iat[pos]}'")
 
-def clear_all_filters():
-    for key in [
-        "filter_support",
-        "filter_funding_type",
-        "filter_funding_bucket",
-        "filter_audience",
-        "filter_region",
-        "filter_stage",
-    ]:
-        st.session_state[key] = []
+    regions = df[col_map["REGION"]].map(clean_cell)
+    unknown = {raw for raw in regions.unique() if raw and classify_region(raw) == [OTHER_REGION]}
+    for pos in np.flatnonzero(regions.isin(unknown).to_numpy()):
+        add(int(pos), "REGION", f"Region names no place in the gazetteer: '{regions.iat[pos]}'")
 
+    checked_raw = df[col_map["LAST_CHECKED"]].map(clean_cell)
+    for pos in np.flatnonzero(((checked_raw != "") & df["__checked"].isna()).to_numpy()):
+        add(int(pos), "LAST_CHECKED", f"Date could not be parsed: '{checked_raw.iat[pos]}'")
+    for pos in np.flatnonzero((checked_raw == "").to_numpy()):
+        add(int(pos), "LAST_CHECKED", "Last checked date missing")
 
-def render_filter_pills(
-    label: str,
-    help_text: str,
-    options: List[Tuple[str, str]],
-    session_key: str,
-):
-    """Pill style filters that store clean values but display labels with counts."""
-    with st.container():
-        st.markdown(
-            f"<div class='sidebar-section'><h3>{label}</h3><small>{help_text}</small></div>",
-            unsafe_allow_html=True,
-        )
-        if session_key not in st.session_state:
-            st.session_state[session_key] = []
-        selected = set(st.session_state[session_key])
+    emails = df[col_map["EMAIL"]].map(clean_cell)
+    for pos, (raw, label, href) in enumerate(
+        zip(emails, df["__email_label"], df["__email_href"])
+    ):
+        if raw and not href and label == raw:
+            add(pos, "EMAIL", f"Email address not recognized: '{raw}'")
 
-        # Single-column layout: each button on its own row
-        for value, label_text in options:
-            is_on = value in selected
-            btn_label = f"● {label_text}" if is_on else label_text
-            if st.button(btn_label, key=f"{session_key}_{value}"):
-                if is_on:
-                    selected.remove(value)
-                else:
-                    selected.add(value)
-                st.session_state[session_key] = sorted(selected)
-                st.rerun()
+    for pos, display in enumerate(df["__phone_display"]):
+        if display and not all(PHONE_DISPLAY.match(p) for p in display.split(" | ")):
+            add(pos, "PHONE", f"Phone number not recognized: '{display}'")
 
-        if selected:
-            if st.button("Clear", key=f"clear_{session_key}"):
-                st.session_state[session_key] = []
-                st.rerun()
+    websites = df[col_map["WEBSITE"]].map(clean_cell)
+    for pos, (raw, url) in enumerate(zip(websites, df["__website_url"])):
+        if raw and raw.lower() not in PLACEHOLDER_VALUES and not url:
+            add(pos, "WEBSITE", f"Website is not a valid URL: '{raw}'")
 
+    return pd.DataFrame(issues, columns=["Row", "Key", "Program", "Field", "Issue"])
 
-def render_funding_type_pills(options: List[Tuple[str, str]]):
-    # Definitions keyed by value; each rendered under its pill.
-    definitions = {
-        "Grant": "Grant - non repayable funding.",
-        "Loan": "Loan - repayable financing with interest.",
-        "Tax Credit": "Tax Credit - reduces taxes based on eligible expenses.",
-        "Voucher or Rebate": "Voucher or Rebate - discounts or partial refunds.",
-        "Equity or Investment": "Equity or Investment - capital in exchange for ownership.",
-        "Other Financing": "Other Financing - other financial products.",
-    }
 
-    label = "What kind of funding are you looking for?"
-    with st.container():
+def render_quality_report(report: pd.DataFrame) -> None:
+    """Admin-only summary of ingest issues (set PATHFINDING_ADMIN=1)."""
+    with st.expander(f"Data quality report ({len(report)} issues)"):
+        if report.empty:
+            st.markdown("No issues found in the current workbook.")
+            return
+        counts = report["Field"].value_counts()
         st.markdown(
-            f"<div class='sidebar-section'><h3>{label}</h3></div>",
-            unsafe_allow_html=True,
+            "  \n".join(f"**{field_key}**: {n}" for field_key, n in counts.items())
+        )
+        st.dataframe(report, hide_index=True)
+        st.download_button(
+            "Download report (CSV)",
+            data=report.to_csv(index=False),
+            file_name="data-quality-report.csv",
+            mime="text/csv",
+            key="quality_download",
         )
 
-        session_key = "filter_funding_type"
-        if session_key not in st.session_state:
-            st.session_state[session_key] = []
-        selected = set(st.session_state[session_key])
 
-        for value, label_text in options:
-            is_on = value in selected
-            btn_label = f"● {label_text}" if is_on else label_text
-            if st.button(btn_label, key=f"{session_key}_{value}"):
-                if is_on:
-                    selected.remove(value)
-                else:
-                    selected.add(value)
-                st.session_state[session_key] = sorted(selected)
-                st.rerun()
+# ---------------------- FACET INDEX ----------------------
+
+
+@dataclass
+class FacetIndex:
+    """Category membership for one facet, bit-packed one row per program.
+
+    ``bits[i]`` holds one bit per ``vocab`` entry for row position ``i``, so
+    a facet costs a few bytes per program instead of a Python list or set.
+    """
+
+    vocab: List[str]
+    bits: np.ndarray
+
+    def mask(self, values: List[str]) -> np.ndarray:
+        """Rows belonging to any of ``values``."""
+        wanted = np.zeros(len(self.vocab), dtype=bool)
+        for v in values:
+            if v in self.vocab:
+                wanted[self.vocab.index(v)] = True
+        packed = np.packbits(wanted, bitorder="little")
+        return (self.bits & packed).any(axis=1)
+
+    def values_at(self, pos: int) -> List[str]:
+        flags = np.unpackbits(self.bits[pos], count=len(self.vocab), bitorder="little")
+        return [self.vocab[i] for i in np.flatnonzero(flags)]
+
+    def counts(self, rows: Optional[np.ndarray] = None) -> Dict[str, int]:
+        """Programs per value, over all rows or only those in the ``rows`` mask."""
+        bits = self.bits if rows is None else self.bits[rows]
+        flags = np.unpackbits(bits, axis=1, count=len(self.vocab), bitorder="little")
+        totals = flags.sum(axis=0)
+        return {v: int(totals[i]) for i, v in enumerate(self.vocab)}
+
+
+def build_facet(rows: List[List[str]]) -> FacetIndex:
+    vocab = sorted({v for cats in rows for v in cats})
+    code = {v: i for i, v in enumerate(vocab)}
+    flags = np.zeros((len(rows), len(vocab)), dtype=bool)
+    for i, cats in enumerate(rows):
+        for v in cats:
+            flags[i, code[v]] = True
+    return FacetIndex(vocab=vocab, bits=np.packbits(flags, axis=1, bitorder="little"))
+
+
+def build_facets(df: pd.DataFrame, col_map: Dict[str, str]) -> Dict[str, FacetIndex]:
+    """Classify every program once, keyed by the session filter key."""
+    tags_list = df[col_map["META_TAGS"]].apply(parse_tags_field_clean).tolist()
+
+    support = [
+        classify_support(tags, fa)
+        for tags, fa in zip(tags_list, df[col_map["FUNDING"]])
+    ]
+    # One gazetteer lookup per distinct Region cell
+    region_col = df[col_map["REGION"]]
+    regions = {raw: classify_region(raw) for raw in region_col.dropna().unique()}
+    return {
+        "filter_support": build_facet(support),
+        "filter_audience": build_facet([classify_audience(t) for t in tags_list]),
+        "filter_region": build_facet(
+            [regions.get(r) or classify_region(r) for r in region_col]
+        ),
+        "filter_stage": build_facet([classify_stage(t) for t in tags_list]),
+        "filter_funding_type": build_facet(
+            [sorted(derive_funding_types_from_tags(t)) for t in tags_list]
+        ),
+    }
+
+
+# ---------------------- SEARCH TERM INDEX ----------------------
+
+# Function words used to guess a row's language; dropped from queries
+ENGLISH_WORDS = {
+    "a", "an", "and", "are", "for", "in", "is", "of", "on", "or", "the", "to", "with", "your",
+}
+FRENCH_WORDS = {
+    "au", "aux", "avec", "dans", "de", "des", "du", "en", "est", "et", "la", "le", "les",
+    "pour", "sont", "sur", "un", "une", "vos", "votre",
+}
+
+EN_SUFFIXES = ("ship", "ment", "ing", "ed", "ly", "e")
+FR_SUFFIXES = (
+    "atrices", "ements", "ations", "atrice", "ateurs", "ement", "ation", "ateur",
+    "ments", "euses", "ieres", "ment", "euse", "iere", "iers", "ique", "ance",
+    "ence", "ier", "eux", "ite", "er", "ee", "e",
+)
+TERM_MIN_STEM = 3
+
+
+def search_words(text: str) -> List[str]:
+    """Accent-folded, lowercased words ("Développement" -> "developpement")."""
+    return re.findall(r"[a-z0-9]+", fold_text(text))
+
+
+def detect_language(words: List[str]) -> str:
+    fr = sum(w in FRENCH_WORDS for w in words)
+    en = sum(w in ENGLISH_WORDS for w in words)
+    return "fr" if fr > en else "en"
+
+
+def stem_en(word: str) -> str:
+    """Light English stemmer: plural, then one derivational or verb suffix."""
+    if word.endswith("ies") and len(word) > 4:
+        word = word[:-3] + "y"
+    elif word.endswith("sses"):
+        word = word[:-2]
+    elif word.endswith("s") and not word.endswith(("ss", "us", "is")) and len(word) > 3:
+        word = word[:-1]
+    for suffix in EN_SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= TERM_MIN_STEM:
+            return word[: -len(suffix)]
+    return word
+
+
+def stem_fr(word: str) -> str:
+    """Light French stemmer: plural, then one derivational or gender suffix."""
+    if word.endswith("aux") and len(word) > 4:
+        word = word[:-3] + "al"
+    elif word.endswith(("s", "x")) and len(word) > 3:
+        word = word[:-1]
+    for suffix in FR_SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= TERM_MIN_STEM:
+            return word[: -len(suffix)]
+    return word
+
+
+STEMMERS = {"en": stem_en, "fr": stem_fr}
+
+# French query words -> the English word the catalogue uses, keyed by French stem
+FRENCH_TERMS = {
+    stem_fr(fr): en
+    for fr, en in {
+        "accelerateur": "accelerator",
+        "accompagnement": "coaching",
+        "agricole": "agriculture",
+        "arrivant": "newcomer",
+        "atelier": "workshop",
+        "autochtone": "indigenous",
+        "conseil": "advisory",
+        "croissance": "growth",
+        "demarrage": "startup",
+        "developpement": "development",
+        "embauche": "hiring",
+        "emploi": "employment",
+        "entreprise": "business",
+        "etudiant": "student",
+        "exportation": "export",
+        "femme": "women",
+        "financement": "funding",
+        "fonds": "fund",
+        "formation": "training",
+        "impot": "tax",
+        "incubateur": "incubator",
+        "investissement": "investment",
+        "jeune": "youth",
+        "mentorat": "mentorship",
+        "noir": "black",
+        "numerique": "digital",
+        "petite": "small",
+        "pret": "loan",
+        "recherche": "research",
+        "reseautage": "networking",
+        "subvention": "grant",
+        "technologie": "technology",
+        "tourisme": "tourism",
+    }.items()
+}
+
+
+def query_words(query: str) -> List[str]:
+    """Folded words of a query to look up; function words only when there is nothing else."""
+    words = search_words(query)
+    content = [w for w in words if w not in ENGLISH_WORDS and w not in FRENCH_WORDS]
+    return content or words
+
+
+def word_stems(word: str) -> Set[str]:
+    """Stems a query word matches exactly: under both stemmers, plus the
+    English equivalent of a French support term."""
+    stems = {stem(word) for stem in STEMMERS.values()}
+    english = FRENCH_TERMS.get(stem_fr(word))
+    if english:
+        stems.add(stem_en(english))
+    return stems
+
+
+def row_terms(df: pd.DataFrame, col_map: Dict[str, str]) -> List[Set[str]]:
+    """Stemmed words of each row's search fields, in the row's own language."""
+    fields = [df[col_map[key]].fillna("").astype(str).tolist() for key in SEARCH_FIELDS]
+    terms = []
+    for texts in zip(*fields):
+        words = search_words(" ".join(texts))
+        stem = STEMMERS[detect_language(words)]
+        terms.append({stem(w) for w in words})
+    return terms
+
+
+def keyword_stems(keywords: List[str]) -> Set[str]:
+    """Stems of the single-word keywords ("micro-loan" and "r&d" are skipped)."""
+    stems: Set[str] = set()
+    for keyword in keywords:
+        words = search_words(keyword)
+        if len(words) == 1 and len(words[0]) >= TERM_MIN_STEM:
+            stems.add(stem_en(words[0]))
+    return stems
+
+
+# Broad words that reach every funding keyword, but not the other way round
+GENERAL_FUNDING_WORDS = ["funding", "financial", "financing"]
+
+
+def build_synonyms() -> Dict[str, Set[str]]:
+    """Stem -> stems a query word expands to, from the classifier keyword groups.
+
+    Funding types and the non-funding support categories are synonym
+    groups: any member finds all of them ("microloan" <-> "loan"). The broad
+    funding category only expands one way: "funding" or "financial" reach
+    every funding keyword, but "grant" still means grants.
+    """
+    groups = [keyword_stems(k) for k in FUNDING_TYPE_KEYWORDS.values()]
+    groups += [
+        keyword_stems(k) for cat, k in SUPPORT_KEYWORDS.items() if cat != FUNDING_SUPPORT
+    ]
+    table: Dict[str, Set[str]] = {}
+    for group in groups:
+        for stem in group:
+            table.setdefault(stem, set()).update(group)
+
+    funding = keyword_stems(SUPPORT_KEYWORDS[FUNDING_SUPPORT])
+    for stem in keyword_stems(GENERAL_FUNDING_WORDS):
+        table.setdefault(stem, set()).update(funding)
+    return table
+
+
+@dataclass
+class TermIndex:
+    """Inverted index from stemmed, accent-folded words to row positions.
+
+    Each row is stemmed with the stemmer for its own language (English or
+    French, guessed from function words). A query word is looked up under
+    both stemmers and as a prefix of the indexed stems, so "développement",
+    "developpement" and "developper" reach the same rows. Common French
+    support terms also reach their English equivalent ("prêt" -> "loan"),
+    and ``synonyms`` maps a stem to the term ids it expands to, compiled at
+    load time so expansion is one dictionary lookup.
+    """
+
+    n: int = 0
+    terms: List[str] = field(default_factory=list)
+    postings: List[np.ndarray] = field(default_factory=list)
+    synonyms: Dict[str, List[int]] = field(default_factory=dict)
+
+    def word_mask(self, word: str) -> Optional[np.ndarray]:
+        """Rows containing ``word`` in any form, or None if no term matches."""
+        stems = word_stems(word)
+        ids = {i for i in map(self._find, stems) if i is not None}
+        for stem in stems:
+            ids.update(self.synonyms.get(stem, ()))
+        lo = bisect.bisect_left(self.terms, word)
+        hi = bisect.bisect_left(self.terms, word + "\U0010ffff")
+        ids.update(range(lo, hi))
+        if not ids:
+            return None
+        mask = np.zeros(self.n, dtype=bool)
+        for i in ids:
+            mask[self.postings[i]] = True
+        return mask
+
+    def mask(self, query: str) -> Optional[np.ndarray]:
+        """Rows containing every content word of ``query``.
+
+        None when a word is not in the index at all (a typo, or a word the
+        catalogue never uses); the caller then falls back to fuzzy matching.
+        """
+        result = np.ones(self.n, dtype=bool)
+        for word in query_words(query):
+            found = self.word_mask(word)
+            if found is None:
+                return None
+            result &= found
+        return result
+
+    def _find(self, term: str) -> Optional[int]:
+        i = bisect.bisect_left(self.terms, term)
+        if i < len(self.terms) and self.terms[i] == term:
+            return i
+        return None
+
+
+def build_term_index(df: pd.DataFrame, col_map: Dict[str, str]) -> TermIndex:
+    rows: Dict[str, List[int]] = {}
+    for pos, terms in enumerate(row_terms(df, col_map)):
+        for term in terms:
+            rows.setdefault(term, []).append(pos)
+    terms = sorted(rows)
+    index = TermIndex(
+        n=len(df),
+        terms=terms,
+        postings=[np.asarray(rows[t], dtype=np.int32) for t in terms],
+    )
+    for stem, targets in build_synonyms().items():
+        ids = sorted(i for i in map(index._find, targets) if i is not None)
+        if ids:
+            index.synonyms[stem] = ids
+    return index
+
+
+# ---------------------- SIMILAR PROGRAMS ----------------------
+
+SIMILAR_K = 5
+SIMILAR_MIN_SCORE = 0.35
+SIMILAR_TEXT_WEIGHT = 0.4
+SIMILAR_CHUNK = 512
+SIMILAR_FACETS = ["filter_support", "filter_audience", "filter_stage", "filter_region"]
+
+
+def build_neighbours(
+    df: pd.DataFrame,
+    col_map: Dict[str, str],
+    facets: Dict[str, FacetIndex],
+    k: int = SIMILAR_K,
+) -> np.ndarray:
+    """Row positions of the ``k`` most similar programs for every row.
+
+    Similarity blends the Jaccard overlap of the category bitsets (tags,
+    support, audience, stage, region) with name similarity. Rows are scored
+    a chunk at a time against the whole catalogue, once per workbook
+    version; unused slots hold -1.
+    """
+    tags = build_facet(df[col_map["META_TAGS"]].apply(parse_tags_field_clean).tolist())
+    bits = np.concatenate([tags.bits] + [facets[key].bits for key in SIMILAR_FACETS], axis=1)
+    flags = np.unpackbits(bits, axis=1).astype(np.float32)
+    sizes = flags.sum(axis=1)
+    names = [collation_key(v) for v in df[col_map["PROGRAM_NAME"]]]
+
+    n = len(df)
+    neighbours = np.full((n, k), -1, dtype=np.int32)
+    for start in range(0, n, SIMILAR_CHUNK):
+        end = min(start + SIMILAR_CHUNK, n)
+        inter = flags[start:end] @ flags.T
+        union = sizes[start:end, None] + sizes[None, :] - inter
+        jaccard = np.divide(inter, union, out=np.zeros_like(inter), where=union > 0)
+        text = process.cdist(
+            names[start:end],
+            names,
+            scorer=fuzz.token_sort_ratio,
+            dtype=np.float32,
+            workers=-1,
+        )
+        score = (1 - SIMILAR_TEXT_WEIGHT) * jaccard + SIMILAR_TEXT_WEIGHT * text / 100
+        score[np.arange(end - start), np.arange(start, end)] = -1  # not itself
+
+        top = np.argsort(-score, axis=1, kind="stable")[:, :k]
+        keep = np.take_along_axis(score, top, axis=1) >= SIMILAR_MIN_SCORE
+        neighbours[start:end, : top.shape[1]] = np.where(keep, top, -1)
+    return neighbours
+
+
+def facet_memberships(
+    df: pd.DataFrame, facets: Dict[str, FacetIndex]
+) -> Dict[str, List[List[str]]]:
+    """Category values of every row, per session filter key."""
+    memberships = {
+        key: [facet.values_at(pos) for pos in range(len(df))]
+        for key, facet in facets.items()
+    }
+    memberships["filter_funding_bucket"] = [[str(b)] for b in df["__funding_bucket"]]
+    return memberships
+
+
+def build_key_positions(df: pd.DataFrame, col_map: Dict[str, str]) -> Dict[str, int]:
+    """First row position of each program key."""
+    positions: Dict[str, int] = {}
+    for pos, key in enumerate(df[col_map["KEY"]].map(clean_cell)):
+        if key:
+            positions.setdefault(key, pos)
+    return positions
+
+
+# ---------------------- CATALOGUE ----------------------
+
+RESULT_CACHE_SIZE = 256
+
+
+def build_sort_orders(df: pd.DataFrame, col_map: Dict[str, str]) -> Dict[str, np.ndarray]:
+    """Row permutations for each non-relevance sort, computed once per dataset.
+
+    Rows with no name, checked date or funding amount go last; ties keep
+    workbook order.
+    """
+    names = [collation_key(v) for v in df[col_map["PROGRAM_NAME"]]]
+    by_name = sorted(range(len(names)), key=lambda i: (names[i] == "", names[i]))
+
+    checked = df["__checked"]
+    missing = checked.isna().to_numpy()
+    newest_first = -checked.to_numpy(dtype="datetime64[D]").astype(np.int64)
+    by_checked = np.lexsort((np.where(missing, 0, newest_first), missing))
+
+    top = df["__funding_max"].to_numpy()
+    unknown = np.isnan(top)
+    by_funding = np.lexsort((np.where(unknown, 0, -top), unknown))
+
+    return {
+        "name": np.asarray(by_name, dtype=np.int64),
+        "checked": by_checked.astype(np.int64),
+        "funding": by_funding.astype(np.int64),
+    }
+
+
+@dataclass
+class FundingIndex:
+    """Row positions sorted by maximum funding, for range filters by binary search.
+
+    Rows with no parsed amount are left out, so they never match a range.
+    """
+
+    n: int
+    order: np.ndarray
+    values: np.ndarray
+
+    def mask(self, lo: Optional[float] = None, hi: Optional[float] = None) -> np.ndarray:
+        """Rows whose maximum funding lies in [lo, hi]."""
+        start = 0 if lo is None else int(np.searchsorted(self.values, lo, side="left"))
+        end = len(self.values) if hi is None else int(np.searchsorted(self.values, hi, side="right"))
+        mask = np.zeros(self.n, dtype=bool)
+        mask[self.order[start:end]] = True
+        return mask
+
+
+def build_funding_index(df: pd.DataFrame) -> FundingIndex:
+    top = df["__funding_max"].to_numpy()
+    known = np.flatnonzero(~np.isnan(top))
+    order = known[np.argsort(top[known], kind="stable")]
+    return FundingIndex(n=len(df), order=order, values=top[order])
+
+
+@dataclass
+class Freshness:
+    """Day counts and labels as of one date, plus the cards rendered with them."""
+
+    as_of: date
+    days: pd.Series
+    labels: pd.Series
+    cards: Dict[int, str] = field(default_factory=dict)
+
+
+class ResultCache:
+    """Thread-safe LRU of ordered row positions, keyed by canonical search params."""
+
+    def __init__(self, size: int = RESULT_CACHE_SIZE):
+        self.size = size
+        self._data: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        with self._lock:
+            positions = self._data.get(key)
+            if positions is not None:
+                self._data.move_to_end(key)
+            return positions
+
+    def put(self, key: str, positions: np.ndarray) -> None:
+        with self._lock:
+            self._data[key] = positions
+            self._data.move_to_end(key)
+            while len(self._data) > self.size:
+                self._data.popitem(last=False)
+
+
+@dataclass
+class Catalogue:
+    """Enriched dataset plus the indexes built from it, shared by all sessions."""
+
+    df: pd.DataFrame
+    cols: Dict[str, str]
+    suggest: PrefixIndex
+    facets: Dict[str, FacetIndex]
+    search_text: List[List[str]]
+    terms: TermIndex
+    sort_orders: Dict[str, np.ndarray]
+    funding: FundingIndex
+    quality: pd.DataFrame
+    neighbours: np.ndarray
+    key_positions: Dict[str, int]
+    results: ResultCache = field(default_factory=ResultCache)
+    freshness: Optional[Freshness] = None
+    store: Optional["sqlite_backend.SqliteStore"] = None
+    tenant_bases: Dict[str, np.ndarray] = field(default_factory=dict)
+    # Stem -> synonym stems, for building SQLite queries (see TermIndex.synonyms)
+    synonyms: Dict[str, Set[str]] = field(default_factory=dict)
+    # Workbook version this was loaded from; keys per-session caches
+    mtime: float = 0.0
+
+    def rows(self, positions: np.ndarray) -> pd.DataFrame:
+        """Full rows at ``positions``, from memory or from the SQLite store."""
+        if self.store is not None:
+            return self.store.rows(positions)
+        return self.df.iloc[positions]
+
+    def row(self, pos: int) -> pd.Series:
+        if self.store is not None:
+            return self.store.row(pos)
+        return self.df.iloc[pos]
+
+
+# One entry: a new workbook version evicts the previous catalogue
+@st.cache_resource(show_spinner=False, max_entries=1)
+def load_catalogue(path: str, mtime: float) -> Catalogue:
+    """Load and index the workbook once per file version (``mtime``)."""
+    df, col_map = load_data(path)
+    facets = build_facets(df, col_map)
+    catalogue = Catalogue(
+        df=df,
+        cols=col_map,
+        suggest=build_prefix_index(df, col_map),
+        facets=facets,
+        search_text=[],
+        terms=TermIndex(),
+        sort_orders=build_sort_orders(df, col_map),
+        funding=build_funding_index(df),
+        quality=build_quality_report(df, col_map),
+        neighbours=build_neighbours(df, col_map, facets),
+        key_positions=build_key_positions(df, col_map),
+        mtime=mtime,
+    )
+    if STORAGE_BACKEND == "sqlite":
+        import sqlite_backend
+
+        catalogue.store = sqlite_backend.open_store(
+            path,
+            df,
+            col_map,
+            facet_memberships(df, facets),
+            [collation_key(v) for v in df[col_map["PROGRAM_NAME"]]],
+            [" ".join(sorted(terms)) for terms in row_terms(df, col_map)],
+            db_path=SQLITE_DB,
+        )
+        catalogue.df = slim_frame(df, col_map)
+        catalogue.synonyms = build_synonyms()
+    else:
+        catalogue.search_text = build_search_text(df, col_map)
+        catalogue.terms = build_term_index(df, col_map)
+    warm_up(catalogue)
+    return catalogue
+
+
+def slim_frame(df: pd.DataFrame, col_map: Dict[str, str]) -> pd.DataFrame:
+    """The columns still read per request when full rows live in SQLite."""
+    keep = [
+        col_map["PROGRAM_NAME"],
+        col_map["ORGANIZATION"],
+        col_map["KEY"],
+        "__funding_bucket",
+        "__checked",
+    ]
+    return df[keep].copy()
+
+
+def current_freshness(catalogue: Catalogue) -> Freshness:
+    """Freshness for today's date, recomputed only when the date changes.
+
+    Cached cards carry their freshness text, so they live on the Freshness
+    object and are dropped with it.
+    """
+    today = date.today()
+    fresh = catalogue.freshness
+    if fresh is None or fresh.as_of != today:
+        days = freshness_days(catalogue.df["__checked"], today)
+        fresh = Freshness(as_of=today, days=days, labels=freshness_labels(days))
+        catalogue.freshness = fresh
+    return fresh
+
+
+# Only the current workbook version's loader (and its Future) is kept
+@st.cache_resource(show_spinner=False, max_entries=1)
+def catalogue_loader(path: str, mtime: float) -> "Future[Catalogue]":
+    """Start loading one workbook version on a background thread."""
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="catalogue-load")
+    future = executor.submit(load_catalogue, path, mtime)
+    executor.shutdown(wait=False)
+    return future
+
+
+def ready_catalogue(path: str) -> Optional[Catalogue]:
+    """The catalogue, or None while it is still loading in the background.
+
+    A failed load is raised here and started again on the next rerun.
+    """
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Data file not found: {path}")
+    future = catalogue_loader(path, os.path.getmtime(path))
+    if not future.done():
+        return None
+    if future.exception() is not None:
+        catalogue_loader.clear()
+    return future.result()
+
+
+# ---------------------- TENANTS ----------------------
+
+
+def tenant_base(catalogue: Catalogue, tenant: tenants.Tenant) -> Optional[np.ndarray]:
+    """Rows a tenant can show, built on first use; None for the full catalogue.
+
+    A filter the catalogue does not know is an error: dropping it would
+    widen the tenant to programs it was meant to exclude.
+    """
+    if not tenant.is_filtered:
+        return None
+    base = catalogue.tenant_bases.get(tenant.id)
+    if base is None:
+        params = parse_qs(tenant.filters)
+        unknown = unknown_filter_params(params, catalogue)
+        if unknown:
+            raise ValueError(f"Tenant '{tenant.id}': unknown filters {unknown}")
+        base = facet_mask(
+            catalogue, parse_filter_params(lambda name: params.get(name, []), catalogue)
+        )
+        if tenant.organizations:
+            wanted = {org.casefold() for org in tenant.organizations}
+            orgs = catalogue.df[catalogue.cols["ORGANIZATION"]].map(clean_cell)
+            base &= orgs.str.casefold().isin(wanted).to_numpy()
+        catalogue.tenant_bases[tenant.id] = base
+    return base
+
+
+# ---------------------- SEARCH & FILTER LOGIC ----------------------
+
+
+@st.cache_resource(show_spinner=False)
+def warn_rerun_probe_missing() -> None:
+    """Log once per process that search cancellation is off."""
+    logging.getLogger("app").warning(
+        "Cannot see pending reruns: Streamlit's ScriptRequests._state has "
+        "changed, so superseded searches will run to completion"
+    )
+
+
+def rerun_pending() -> bool:
+    """True when the browser has already sent a newer rerun for this session.
+
+    Streamlit only interrupts a script at its next ``st.*`` call, so a long
+    scoring loop would otherwise run to completion for a query the user has
+    already typed past. Falls back to False outside a Streamlit runtime.
+
+    Reads the private ``ScriptRequests._state`` (tested against Streamlit
+    1.66.0). If a Streamlit upgrade removes it, a warning is logged once and
+    searches are no longer cancelled.
+    """
+    ctx = get_script_run_ctx()
+    if ctx is None:
+        return False
+    state = getattr(getattr(ctx, "script_requests", None), "_state", None)
+    value = getattr(state, "value", None)
+    if value is None:
+        warn_rerun_probe_missing()
+        return False
+    return value == "RERUN"
+
+
+def normalize_query(query: str) -> str:
+    q = fold_text(sanitize_text_keep_smart(query or ""))
+    if len(q) < MIN_QUERY_LEN:
+        return ""
+    return q
+
+
+SEARCH_FIELDS = ["PROGRAM_NAME", "ORGANIZATION", "DESCRIPTION", "ELIGIBILITY"]
+
+
+def build_search_text(df: pd.DataFrame, col_map: Dict[str, str]) -> List[List[str]]:
+    """Accent- and case-folded text of each searchable field, prepared once per catalogue."""
+    return [
+        [fold_text(v) for v in df[col_map[key]].fillna("").astype(str)]
+        for key in SEARCH_FIELDS
+    ]
+
+
+def fuzzy_mask(
+    texts: List[List[str]],
+    query: str,
+    threshold: int = FUZZY_THR,
+    cancel: Optional[Callable[[], bool]] = None,
+) -> Optional[np.ndarray]:
+    """Fuzzy match the query against the prepared search fields.
+
+    Returns None when ``cancel`` reports that the query has been superseded
+    before every chunk was scored.
+    """
+    n = len(texts[0]) if texts else 0
+    q = normalize_query(query)
+    if not q:
+        return np.ones(n, dtype=bool)
+
+    best = np.zeros(n, dtype=np.float32)
+    for start in range(0, n, SCORE_CHUNK):
+        if cancel is not None and cancel():
+            return None
+        end = start + SCORE_CHUNK
+        for col_vals in texts:
+            col_scores = [fuzz.partial_ratio(q, v) for v in col_vals[start:end]]
+            np.maximum(best[start:end], col_scores, out=best[start:end])
+
+    return best >= threshold
+
+
+def query_mask(
+    catalogue: Catalogue, query: str, cancel: Optional[Callable[[], bool]] = None
+) -> Optional[np.ndarray]:
+    """Term index lookup, falling back to a fuzzy scan for unindexed words."""
+    q = normalize_query(query)
+    if not q:
+        return np.ones(len(catalogue.df), dtype=bool)
+    if catalogue.store is None:
+        mask = catalogue.terms.mask(q)
+        if mask is not None:
+            return mask
+        texts = catalogue.search_text
+    else:
+        # The term lookup ran in SQLite (see find_results); the text is read
+        # from the store for this scan only, keeping the process slim
+        texts = [[fold_text(v) for v in col] for col in catalogue.store.texts()]
+    return fuzzy_mask(texts, q, threshold=FUZZY_THR, cancel=cancel)
+
+
+def sqlite_query_words(catalogue: Catalogue, query: str) -> List[Tuple[Set[str], str]]:
+    """Each query word as (stems matched exactly, prefix), expanded the way
+    TermIndex.word_mask expands it."""
+    words = []
+    for word in query_words(normalize_query(query)):
+        stems = word_stems(word)
+        for stem in list(stems):
+            stems |= catalogue.synonyms.get(stem, set())
+        words.append((stems, word))
+    return words
+
+
+def search_mask(catalogue: Catalogue, query: str) -> np.ndarray:
+    """Search mask for this session, reusing the last result if unchanged.
+
+    Pill toggles and paging rerun the whole script; only a changed query
+    or a new workbook version needs a new pass over the catalogue. If a newer rerun is already queued
+    the scan is abandoned and the script restarts with the latest input.
+    """
+    q = normalize_query(query)
+    cached = st.session_state.get("_search_cache")
+    if cached and cached[0] == q and cached[1] == catalogue.mtime:
+        return cached[2]
+
+    mask = query_mask(catalogue, q, cancel=rerun_pending)
+    if mask is None:
+        st.rerun()
+    st.session_state["_search_cache"] = (q, catalogue.mtime, mask)
+    return mask
+
+
+def live_search_kwargs() -> Dict[str, str]:
+    """Extra text_input arguments for search-as-you-type, when available."""
+    if not st.session_state.get("search_live", True):
+        return {}
+    if not LIVE_SEARCH_SUPPORTED:
+        return {}
+    return {"live": SEARCH_DEBOUNCE}
+
+
+def find_results(
+    catalogue: Catalogue,
+    query: str,
+    filters: Dict[str, List[str]],
+    sort: str,
+    search: Callable[[Catalogue, str], np.ndarray] = search_mask,
+    tenant: tenants.Tenant = tenants.DEFAULT_TENANT,
+) -> np.ndarray:
+    """Ordered row positions for a search state, served from the result cache.
+
+    ``search`` defaults to the per-session search; the warm-up job passes a
+    plain ``query_mask`` because it runs outside any session. Sorting walks
+    a precomputed permutation and keeps the matching rows, in linear time.
+    With the SQLite backend the query runs in the database instead, over
+    the same stems, French terms and synonyms. Either way the tenant's base mask is applied last.
+    """
+    key = result_key(query, filters, sort, tenant.id)
+    positions = catalogue.results.get(key)
+    if positions is not None:
+        return positions
+    base = tenant_base(catalogue, tenant)
+
+    if catalogue.store is not None:
+        # Term match, join-table facets and ORDER BY in SQLite
+        facets = {k: v for k, v in filters.items() if k != "filter_funding_min"}
+        if facets.get("filter_region"):
+            facets["filter_region"] = expand_regions(facets["filter_region"])
+        min_funding = filters.get("filter_funding_min")
+        min_amount = float(min_funding[0]) if min_funding else None
+        positions = catalogue.store.positions(
+            sqlite_query_words(catalogue, query), facets, sort, min_funding=min_amount
+        )
+        if positions is None:
+            # A word matches no indexed term: fuzzy-match, as in memory
+            mask = search(catalogue, query)
+            positions = catalogue.store.positions([], facets, sort, min_funding=min_amount)
+            positions = positions[mask[positions]]
+        if base is not None:
+            positions = positions[base[positions]]
+        catalogue.results.put(key, positions)
+        return positions
+
+    overall = search(catalogue, query) & facet_mask(catalogue, filters)
+    if base is not None:
+        overall &= base
+
+    order = catalogue.sort_orders.get(sort)
+    if order is None:
+        positions = np.flatnonzero(overall)
+    else:
+        positions = order[overall[order]]
+
+    catalogue.results.put(key, positions)
+    return positions
+
+
+def facet_mask(catalogue: Catalogue, filters: Dict[str, List[str]]) -> np.ndarray:
+    """Rows matching every facet with a selection, any value within a facet.
+
+    Answered from the bit-packed indexes; a region also matches the
+    regions above it.
+    """
+    df = catalogue.df
+    overall = np.ones(len(df), dtype=bool)
+    for session_key, vals in filters.items():
+        if not vals:
+            continue
+        if session_key == "filter_funding_bucket":
+            overall &= df["__funding_bucket"].isin(vals).to_numpy()
+        elif session_key == "filter_funding_min":
+            overall &= catalogue.funding.mask(lo=float(vals[0]))
+        elif session_key == "filter_region":
+            overall &= catalogue.facets[session_key].mask(expand_regions(vals))
+        else:
+            overall &= catalogue.facets[session_key].mask(vals)
+    return overall
+
+
+def session_filters() -> Dict[str, List[str]]:
+    return {key: st.session_state[key] for key in FILTER_KEYS if st.session_state.get(key)}
+
+
+def session_result_key() -> str:
+    """Result key of the session's search, filters and sort."""
+    return result_key(
+        st.session_state.get("search_q", ""),
+        session_filters(),
+        st.session_state.get("sort_by", "relevance"),
+        shell.session_tenant().id,
+    )
+
+
+def apply_filters(catalogue: Catalogue) -> Tuple[np.ndarray, Dict[str, List[str]]]:
+    """Row positions matching the session's search state, in display order."""
+    q = st.session_state.get("search_q", "")
+    active_filters = session_filters()
+    sort = st.session_state.get("sort_by", "relevance")
+    tenant = shell.session_tenant()
+
+    # "My saved programs" view, until the search, filters or sort change
+    saved_from = st.session_state.get("saved_view")
+    if saved_from is not None:
+        if saved_from == result_key(q, active_filters, sort, tenant.id):
+            return saved_positions(catalogue, tenant), {}
+        st.session_state["saved_view"] = None
+
+    positions = find_results(catalogue, q, active_filters, sort, tenant=tenant)
+
+    # "Similar programs" view: the chosen program and its neighbours,
+    # narrowed by any search or filters still in place. The chosen program
+    # stays even when they exclude it, unless it is outside the tenant.
+    anchor = similar_anchor(catalogue)
+    if anchor is not None:
+        related = similar_positions(catalogue, anchor)
+        keep = np.isin(related, positions)
+        base = tenant_base(catalogue, tenant)
+        keep[0] = base is None or bool(base[anchor])
+        positions = related[keep]
+    return positions, active_filters
+
+
+def similar_anchor(catalogue: Catalogue) -> Optional[int]:
+    return catalogue.key_positions.get(st.session_state.get("similar_to", ""))
+
+
+def similar_positions(catalogue: Catalogue, pos: int) -> np.ndarray:
+    """The program at ``pos`` followed by its precomputed neighbours."""
+    neighbours = catalogue.neighbours[pos]
+    return np.concatenate(([pos], neighbours[neighbours >= 0])).astype(np.int64)
+
+
+def clear_similar() -> None:
+    st.session_state["similar_to"] = ""
+
+
+def clear_all_filters():
+    for key in FILTER_KEYS:
+        st.session_state[key] = []
+    clear_similar()
+    close_saved_view()
+
+
+# ---------------------- URL STATE ----------------------
+
+URL_FILTER_PARAMS = {
+    "filter_support": "support",
+    "filter_funding_type": "type",
+    "filter_funding_bucket": "amount",
+    "filter_audience": "audience",
+    "filter_region": "region",
+    "filter_stage": "stage",
+    "filter_funding_min": "min_funding",
+}
+
+
+def canonical_params(
+    query: str, filters: Dict[str, List[str]], sort: str, tenant: str = ""
+) -> List[Tuple[str, str]]:
+    """Sorted (name, value) pairs describing a result set; defaults are omitted."""
+    pairs: List[Tuple[str, str]] = []
+    if tenant:
+        pairs.append(("tenant", tenant))
+    if query:
+        pairs.append(("q", query))
+    for session_key, param in URL_FILTER_PARAMS.items():
+        for val in sorted(set(filters.get(session_key, []))):
+            pairs.append((param, val))
+    if sort != "relevance":
+        pairs.append(("sort", sort))
+    return sorted(pairs)
+
+
+def result_key(
+    query: str, filters: Dict[str, List[str]], sort: str, tenant: str = ""
+) -> str:
+    """Cache key for a result set; equal to its query string with the query normalized."""
+    return urlencode(canonical_params(normalize_query(query), filters, sort, tenant))
+
+
+def view_key(query: str, filters: Dict[str, List[str]], sort: str) -> str:
+    """Result key plus the "similar programs" anchor; paging resets when it changes."""
+    key = result_key(query, filters, sort, st.session_state.get("tenant", ""))
+    similar = st.session_state.get("similar_to", "")
+    if similar:
+        key += "&" + urlencode([("similar", similar)])
+    if st.session_state.get("saved_view") is not None:
+        key += "&saved=1"
+    return key
+
+
+def session_url_params() -> List[Tuple[str, str]]:
+    filters = {key: st.session_state.get(key, []) for key in FILTER_KEYS}
+    pairs = canonical_params(
+        sanitize_text_keep_smart(st.session_state.get("search_q", "")),
+        filters,
+        st.session_state.get("sort_by", "relevance"),
+        st.session_state.get("tenant", ""),
+    )
+    if st.session_state.get("similar_to"):
+        pairs.append(("similar", st.session_state["similar_to"]))
+    if st.session_state.get("per_page", 25) != 25:
+        pairs.append(("per_page", str(st.session_state["per_page"])))
+    if st.session_state.get("page", 1) > 1:
+        pairs.append(("page", str(st.session_state["page"])))
+    return sorted(pairs)
+
+
+def parse_filter_params(
+    get_all: Callable[[str], List[str]], catalogue: Catalogue
+) -> Dict[str, List[str]]:
+    """Filter selections from URL-style params, dropping unknown values."""
+    filters: Dict[str, List[str]] = {}
+    for session_key, param in URL_FILTER_PARAMS.items():
+        vals = get_all(param)
+        if not vals:
+            continue
+        if session_key == "filter_funding_min":
+            amounts = [v for v in vals if v.isdigit() and int(v) > 0]
+            filters[session_key] = [str(int(amounts[0]))] if amounts else []
+            continue
+        known = known_filter_values(session_key, catalogue)
+        filters[session_key] = sorted({v for v in vals if v in known})
+    return filters
+
+
+def known_filter_values(session_key: str, catalogue: Catalogue) -> Set[str]:
+    if session_key == "filter_funding_bucket":
+        return set(FUNDING_BUCKETS)
+    return set(catalogue.facets[session_key].vocab)
+
+
+def unknown_filter_params(params: Dict[str, List[str]], catalogue: Catalogue) -> List[str]:
+    """The ``name=value`` pairs in ``params`` that parse_filter_params would drop."""
+    session_keys = {param: key for key, param in URL_FILTER_PARAMS.items()}
+    unknown = []
+    for param, vals in sorted(params.items()):
+        session_key = session_keys.get(param)
+        for v in vals:
+            if session_key is None:
+                ok = False
+            elif session_key == "filter_funding_min":
+                ok = v.isdigit() and int(v) > 0
+            else:
+                ok = v in known_filter_values(session_key, catalogue)
+            if not ok:
+                unknown.append(f"{param}={v}")
+    return unknown
+
+
+def load_url_search_state() -> None:
+    """Seed the search box, sort and paging from the URL on a session's first run.
+
+    Needs no catalogue, so the search row can render while it loads.
+    """
+    if st.session_state.get("_url_search_loaded"):
+        return
+    st.session_state["_url_search_loaded"] = True
+    params = st.query_params
+
+    if params.get("q"):
+        st.session_state["search_q"] = params.get("q")
+    if params.get("sort") in SORT_OPTIONS:
+        st.session_state["sort_by"] = params.get("sort")
+    per_page = params.get("per_page", "")
+    if per_page.isdigit() and int(per_page) in PER_PAGE_OPTIONS:
+        st.session_state["per_page"] = int(per_page)
+    else:
+        st.session_state["per_page"] = 25
+    page = params.get("page", "")
+    if page.isdigit() and int(page) >= 1:
+        st.session_state["page"] = int(page)
+
+
+def load_url_state(catalogue: Catalogue) -> None:
+    """Seed filters and the similar-programs view from the URL, once per session."""
+    if st.session_state.get("_url_state_loaded"):
+        return
+    st.session_state["_url_state_loaded"] = True
+    params = st.query_params
+
+    for session_key, vals in parse_filter_params(params.get_all, catalogue).items():
+        st.session_state[session_key] = vals
+    if params.get("similar") in catalogue.key_positions:
+        st.session_state["similar_to"] = params.get("similar")
+
+    filters = {key: st.session_state.get(key, []) for key in FILTER_KEYS}
+    st.session_state["_result_key"] = view_key(
+        st.session_state.get("search_q", ""),
+        filters,
+        st.session_state.get("sort_by", "relevance"),
+    )
+
+
+def sync_url_state() -> None:
+    """Write the canonical search state back to the address bar."""
+    pairs = session_url_params()
+    current = sorted((k, v) for k in st.query_params for v in st.query_params.get_all(k))
+    if pairs == current:
+        return
+    grouped: Dict[str, List[str]] = {}
+    for name, val in pairs:
+        grouped.setdefault(name, []).append(val)
+    st.query_params.from_dict(grouped)
+
+
+def render_export(catalogue: Catalogue, positions: np.ndarray) -> None:
+    """Download button for the whole result set; the file is built on click."""
+    import export
+
+    with st.expander(f"Download all {len(positions)} matching programs"):
+        fmt = st.radio(
+            "File format",
+            list(export.EXPORT_FORMATS),
+            horizontal=True,
+            key="export_format",
+        )
+        ext, mime = export.EXPORT_FORMATS[fmt]
+        st.download_button(
+            "Download",
+            data=lambda: export.export_results(
+                catalogue.rows, catalogue.cols, positions, fmt
+            ),
+            file_name=f"alberta-business-supports.{ext}",
+            mime=mime,
+            key="export_download",
+        )
+
+
+def log_event(event: str, **fields) -> None:
+    """Queue a usage event tagged with this session; never blocks on I/O."""
+    import analytics
+
+    ctx = get_script_run_ctx()
+    analytics.record(event, session=ctx.session_id if ctx else "", **fields)
+
+
+def log_view(
+    catalogue: Catalogue, key: str, positions: np.ndarray, page: int, shown: np.ndarray
+) -> None:
+    """Log a search when the result set changes and impressions when the page does."""
+    if st.session_state.get("_logged_key") != key:
+        st.session_state["_logged_key"] = key
+        log_event(
+            "search",
+            q=normalize_query(st.session_state.get("search_q", "")),
+            params=key,
+            results=int(len(positions)),
+        )
+    view = (key, page, len(shown))
+    if st.session_state.get("_logged_page") != view and len(shown):
+        st.session_state["_logged_page"] = view
+        keys = catalogue.df[catalogue.cols["KEY"]].to_numpy()[shown]
+        log_event("impressions", params=key, page=page, keys=[clean_cell(k) for k in keys])
+
+
+def set_page(page: int) -> None:
+    st.session_state["page"] = page
+
+
+def render_pager(page: int, max_page: int) -> None:
+    if max_page <= 1:
+        return
+    col_prev, col_info, col_next = st.columns([1, 2, 1])
+    with col_prev:
+        st.button(
+            "Previous",
+            key="page_prev",
+            disabled=page <= 1,
+            on_click=set_page,
+            args=(page - 1,),
+        )
+    with col_info:
+        st.markdown(
+            f"<p class='results-summary'>Page {page} of {max_page}</p>",
+            unsafe_allow_html=True,
+        )
+    with col_next:
+        st.button(
+            "Next",
+            key="page_next",
+            disabled=page >= max_page,
+            on_click=set_page,
+            args=(page + 1,),
+        )
+
+
+def render_filter_pills(
+    label: str,
+    help_text: str,
+    options: List[Tuple[str, str]],
+    session_key: str,
+):
+    """Pill style filters that store clean values but display labels with counts."""
+    with st.container():
+        st.markdown(
+            f"<div class='sidebar-section'><h3>{label}</h3><small>{help_text}</small></div>",
+            unsafe_allow_html=True,
+        )
+        if session_key not in st.session_state:
+            st.session_state[session_key] = []
+        selected = set(st.session_state[session_key])
+
+        # Single-column layout: each button on its own row
+        for value, label_text in options:
+            is_on = value in selected
+            btn_label = f"● {label_text}" if is_on else label_text
+            if st.button(btn_label, key=f"{session_key}_{value}"):
+                if is_on:
+                    selected.remove(value)
+                else:
+                    selected.add(value)
+                st.session_state[session_key] = sorted(selected)
+                log_event("filter", filter=URL_FILTER_PARAMS[session_key], value=value, on=not is_on)
+                st.rerun()
+
+        if selected:
+            if st.button("Clear", key=f"clear_{session_key}"):
+                st.session_state[session_key] = []
+                st.rerun()
+
+
+def render_funding_type_pills(options: List[Tuple[str, str]]):
+    # Definitions keyed by value; each rendered under its pill.
+    definitions = {
+        "Grant": "Grant - non repayable funding.",
+        "Loan": "Loan - repayable financing with interest.",
+        "Tax Credit": "Tax Credit - reduces taxes based on eligible expenses.",
+        "Voucher or Rebate": "Voucher or Rebate - discounts or partial refunds.",
+        "Equity or Investment": "Equity or Investment - capital in exchange for ownership.",
+        "Other Financing": "Other Financing - other financial products.",
+    }
+
+    label = "What kind of funding are you looking for?"
+    with st.container():
+        st.markdown(
+            f"<div class='sidebar-section'><h3>{label}</h3></div>",
+            unsafe_allow_html=True,
+        )
+
+        session_key = "filter_funding_type"
+        if session_key not in st.session_state:
+            st.session_state[session_key] = []
+        selected = set(st.session_state[session_key])
+
+        for value, label_text in options:
+            is_on = value in selected
+            btn_label = f"● {label_text}" if is_on else label_text
+            if st.button(btn_label, key=f"{session_key}_{value}"):
+                if is_on:
+                    selected.remove(value)
+                else:
+                    selected.add(value)
+                st.session_state[session_key] = sorted(selected)
+                log_event("filter", filter=URL_FILTER_PARAMS[session_key], value=value, on=not is_on)
+                st.rerun()
 
             # definition directly under this pill
             defn = definitions.get(value)
@@ -1022,6 +2207,26 @@ def render_funding_type_pills(options: List[Tuple[str, str]]):
                 st.rerun()
 
 
+def set_funding_min() -> None:
+    amount = int(st.session_state.get("funding_min_input") or 0)
+    st.session_state["filter_funding_min"] = [str(amount)] if amount > 0 else []
+    log_event("filter", filter="min_funding", value=str(amount), on=amount > 0)
+
+
+def render_funding_min() -> None:
+    """Minimum funding amount, matched against each program's parsed maximum."""
+    current = st.session_state.get("filter_funding_min") or ["0"]
+    st.session_state["funding_min_input"] = int(current[0])
+    st.number_input(
+        "Minimum funding needed ($)",
+        min_value=0,
+        step=5000,
+        key="funding_min_input",
+        on_change=set_funding_min,
+        help="Shows programs whose maximum funding is at least this amount. Set to 0 to show all.",
+    )
+
+
 def render_chips(active_filters: Dict[str, List[str]]):
     if not active_filters:
         return
@@ -1041,9 +2246,12 @@ def render_chips(active_filters: Dict[str, List[str]]):
                 prefix = "Region:"
             elif key == "filter_stage":
                 prefix = "Stage:"
+            elif key == "filter_funding_min":
+                prefix = "Funding at least:"
             else:
                 prefix = ""
-            label = f"{prefix} {val}" if prefix else val
+            shown = f"${int(val):,}" if key == "filter_funding_min" else val
+            label = f"{prefix} {shown}" if prefix else shown
             flat.append((key, val, label))
 
     if not flat:
@@ -1061,23 +2269,454 @@ def render_chips(active_filters: Dict[str, List[str]]):
                 if val in cur:
                     cur.remove(val)
                     st.session_state[key] = sorted(cur)
+                    log_event("filter", filter=URL_FILTER_PARAMS[key], value=val, on=False)
                 st.rerun()
 
     st.markdown("</div>", unsafe_allow_html=True)
 
 
+def render_similar_banner(catalogue: Catalogue) -> None:
+    anchor = similar_anchor(catalogue)
+    if anchor is None:
+        return
+    name = sanitize_text_keep_smart(
+        clean_cell(catalogue.df.iloc[anchor][catalogue.cols["PROGRAM_NAME"]])
+    )
+    st.markdown(
+        f"<p class='results-summary'>Showing programs similar to <strong>{html.escape(name)}</strong>.</p>",
+        unsafe_allow_html=True,
+    )
+    st.button("Back to all programs", key="similar_clear", on_click=clear_similar)
+
+
+# ---------------------- ELIGIBILITY PRE-SCREEN ----------------------
+
+SCREEN_ANY = "Any / not sure"
+
+# Programs open to everyone in a facet still fit any specific answer
+SCREEN_OPEN_TO_ALL = {
+    "filter_stage": ["Open to All Stages"],
+    "filter_audience": ["All Small Businesses"],
+}
+
+
+def screen_filters(
+    stage: str,
+    region: str,
+    audiences: List[str],
+    funding_types: List[str],
+    amount: str,
+) -> Dict[str, List[str]]:
+    """Facet selections for one set of questionnaire answers.
+
+    A specific answer also keeps the programs open to everyone in that
+    facet (for regions, through the region hierarchy), and a funding amount
+    keeps every band at or above it.
+    """
+    filters: Dict[str, List[str]] = {
+        key: [] for key in FILTER_KEYS if key != "filter_support"
+    }
+    if stage != SCREEN_ANY:
+        filters["filter_stage"] = sorted({stage, *SCREEN_OPEN_TO_ALL["filter_stage"]})
+    if region != SCREEN_ANY:
+        filters["filter_region"] = [region]
+    if audiences:
+        filters["filter_audience"] = sorted(
+            {*audiences, *SCREEN_OPEN_TO_ALL["filter_audience"]}
+        )
+    filters["filter_funding_type"] = sorted(funding_types)
+    if amount != SCREEN_ANY:
+        bands = FUNDING_BUCKETS[: FUNDING_BUCKETS.index(UNKNOWN)]
+        filters["filter_funding_bucket"] = bands[bands.index(amount) :]
+    return filters
+
+
+def apply_screen() -> None:
+    """Form callback: replace the facet selections with the screen's answers."""
+    filters = screen_filters(
+        st.session_state["screen_stage"],
+        st.session_state["screen_region"],
+        st.session_state["screen_audience"],
+        st.session_state["screen_funding_type"],
+        st.session_state["screen_amount"],
+    )
+    for key, vals in filters.items():
+        st.session_state[key] = vals
+    clear_similar()
+    log_event(
+        "screen",
+        params=urlencode(canonical_params("", filters, "relevance")),
+    )
+
+
+def render_prescreen(catalogue: Catalogue) -> None:
+    """Five questions answered together; one submit, one evaluation."""
+
+    def answers(session_key: str) -> List[str]:
+        broad = set(SCREEN_OPEN_TO_ALL.get(session_key, []))
+        if session_key == "filter_region":
+            broad |= BROAD_REGIONS
+        return [v for v in catalogue.facets[session_key].vocab if v not in broad]
+
+    funding_types = set(catalogue.facets["filter_funding_type"].vocab)
+    with st.expander("Not sure where to start? Answer five quick questions"):
+        with st.form("prescreen", border=False):
+            st.selectbox(
+                "Where is your business in its journey?",
+                [SCREEN_ANY] + answers("filter_stage"),
+                key="screen_stage",
+            )
+            st.selectbox(
+                "Where is your business located?",
+                [SCREEN_ANY] + answers("filter_region"),
+                key="screen_region",
+            )
+            st.multiselect(
+                "Does your business belong to any of these groups?",
+                answers("filter_audience"),
+                key="screen_audience",
+            )
+            st.multiselect(
+                "What kind of funding are you looking for?",
+                [t for t in FUNDING_TYPES if t in funding_types],
+                key="screen_funding_type",
+            )
+            st.selectbox(
+                "How much funding do you need?",
+                [SCREEN_ANY] + FUNDING_BUCKETS[: FUNDING_BUCKETS.index(UNKNOWN)],
+                format_func=lambda b: b if b == SCREEN_ANY else add_dollar_signs(b),
+                key="screen_amount",
+            )
+            st.form_submit_button("Show matching programs", on_click=apply_screen)
+
+
+# ---------------------- FAVOURITES ----------------------
+
+# Browser cookie holding the random id that owns a visitor's saved programs
+USER_COOKIE = "pf_user"
+USER_COOKIE_MAX_AGE = 400 * 24 * 60 * 60
+USER_ID_RE = re.compile(r"[0-9a-f]{32}")
+
+
+def user_cookie() -> str:
+    value = st.context.cookies.get(USER_COOKIE)
+    return value if isinstance(value, str) else ""
+
+
+def session_user() -> str:
+    """Id of the visitor whose saved programs this session shows.
+
+    Read from the browser cookie when there is one; otherwise a new random
+    id, written to the cookie once the visitor saves a program.
+    """
+    user = user_cookie()
+    if USER_ID_RE.fullmatch(user):
+        return user
+    if "_user" not in st.session_state:
+        st.session_state["_user"] = favourites.store().new_user()
+    return st.session_state["_user"]
+
+
+def set_user_cookie() -> None:
+    st.html(
+        f"<script>document.cookie = '{USER_COOKIE}={session_user()}; "
+        f"max-age={USER_COOKIE_MAX_AGE}; path=/; SameSite=Lax';</script>",
+        unsafe_allow_javascript=True,
+    )
+
+
+def toggle_favourite(key: str) -> None:
+    saved = favourites.store().toggle(session_user(), key)
+    log_event("favourite", key=key, on=saved)
+    if user_cookie() != session_user():
+        st.session_state["_set_user_cookie"] = True
+
+
+@st.fragment
+def render_favourite_toggle(pos: int, key: str) -> None:
+    """Save button under a card. A click reruns only this fragment, not the search."""
+    saved = favourites.store().is_saved(session_user(), key)
+    st.button(
+        "★ Saved" if saved else "☆ Save",
+        key=f"fav_{pos}",
+        help="Remove from your saved programs" if saved else "Add to your saved programs",
+        on_click=toggle_favourite,
+        args=(key,),
+    )
+    if st.session_state.pop("_set_user_cookie", False):
+        set_user_cookie()
+
+
+def saved_positions(catalogue: Catalogue, tenant: tenants.Tenant) -> np.ndarray:
+    """Row positions of the visitor's saved programs, in catalogue order.
+
+    Looked up by key, so the cost depends on the number saved, not the
+    catalogue size. Programs no longer in the workbook are skipped.
+    """
+    keys = favourites.store().keys(session_user())
+    positions = np.fromiter(
+        (catalogue.key_positions[k] for k in keys if k in catalogue.key_positions),
+        dtype=np.int64,
+    )
+    positions.sort()
+    base = tenant_base(catalogue, tenant)
+    if base is not None:
+        positions = positions[base[positions]]
+    return positions
+
+
+def open_saved_view() -> None:
+    st.session_state["saved_view"] = session_result_key()
+    clear_similar()
+
+
+def close_saved_view() -> None:
+    st.session_state["saved_view"] = None
+
+
+def render_saved_banner(total: int) -> None:
+    if st.session_state.get("saved_view") is None:
+        return
+    noun = "program" if total == 1 else "programs"
+    st.markdown(
+        f"<p class='results-summary'>Showing your <strong>{total}</strong> saved {noun}.</p>",
+        unsafe_allow_html=True,
+    )
+    st.button("Back to all programs", key="saved_clear", on_click=close_saved_view)
+
+
+# ---------------------- CARD RENDERING ----------------------
+
+# Where the per-session "Similar programs" list goes in a cached card
+SIMILAR_SLOT = "<!--similar-->"
+
+
+def build_card_html(catalogue: Catalogue, pos: int) -> str:
+    """HTML for one program card, from its row position in the catalogue."""
+    cols = catalogue.cols
+    row = catalogue.row(pos)
+    name = sanitize_text_keep_smart(str(row[cols["PROGRAM_NAME"]] or ""))
+    org = sanitize_text_keep_smart(str(row[cols["ORGANIZATION"]] or ""))
+    desc_full = str(row[cols["DESCRIPTION"]] or "")
+    badge_label = str(row["__status_badge"])
+    fund_bucket_val = str(row.get("__funding_bucket") or "")
+    fund_types = catalogue.facets["filter_funding_type"].values_at(pos)
+    checked = row["__checked"]
+    fresh_date = "" if pd.isna(checked) else checked.date().isoformat()
+    fresh_label = str(current_freshness(catalogue).labels.iloc[pos])
+
+    website_url = row["__website_url"]
+    email_label = str(row["__email_label"])
+    email_href = row["__email_href"]
+    phone_display_multi = row["__phone_display"]
+
+    # Badge
+    badge_cls = STATUS_BADGES[badge_label]
+
+    # Description (truncated, plain HTML-safe)
+    desc_short = truncate_for_card(desc_full)
+    desc_html = html.escape(desc_short)
+
+    # Funding amount display logic
+    fund_raw = sanitize_text_keep_smart(
+        str(row.get(cols["FUNDING"]) or "").strip()
+    )
+    fund_label = ""
+    if fund_raw and "$" in fund_raw:
+        fund_label = fund_raw
+    elif fund_bucket_val and fund_bucket_val.strip().lower() != UNKNOWN.lower():
+        fund_label = add_dollar_signs(fund_bucket_val)
+
+    fund_type_label = ", ".join(fund_types)
+
+    if fund_label:
+        fund_line = f'<span class="kv"><strong>Funding available:</strong> {html.escape(fund_label)}</span>'
+    else:
+        fund_line = ""
+
+    fund_type_line = (
+        f'<span class="kv"><strong>Funding type:</strong> {html.escape(fund_type_label)}</span>'
+        if fund_type_label
+        else ""
+    )
+
+    elig_text = drop_url_like(
+        sanitize_text_keep_smart(str(row.get(cols["ELIGIBILITY"]) or ""))
+    )
+    elig_line = ""
+    if (
+        elig_text
+        and "description pending" not in elig_text.lower()
+        and "see website" not in elig_text.lower()
+    ):
+        elig_line = f'<span class="kv"><strong>Eligibility highlights:</strong> {html.escape(elig_text)}</span>'
+
+    meta_html_parts = [p for p in [fund_line, fund_type_line, elig_line] if p]
+    if meta_html_parts:
+        inner = " ".join(meta_html_parts)
+        meta_html = f'<div class="meta-strip">{inner}</div>'
+    else:
+        meta_html = (
+            '<p class="placeholder">Funding or eligibility details are not available in this view.</p>'
+        )
+
+    # Actions
+    actions: List[str] = []
+
+    if website_url:
+        actions.append(f'<a href="{html.escape(website_url)}" target="_blank" rel="noopener">Website</a>')
+
+    if email_href:
+        actions.append(f'<a href="{html.escape(email_href)}">Email</a>')
+    elif email_label:
+        actions.append(f'<span class="pf-action-muted">{html.escape(email_label)}</span>')
+
+    if phone_display_multi:
+        actions.append(
+            f'<span class="pf-action-muted">Call: {html.escape(phone_display_multi)}</span>'
+        )
+
+    actions_html = ""
+    if actions:
+        actions_html = '<div class="pf-actions">' + " ".join(actions) + "</div>"
+
+    org_html = (
+        f'<div class="program-org">{html.escape(org)}</div>' if org else ""
+    )
+
+    return f"""
+<div class="pf-card">
+  <div>
+    <span class="badge {badge_cls}">{badge_label}</span>
+    <span class="meta">Last checked: {html.escape(fresh_date) if fresh_date else "Not available"} - {html.escape(fresh_label)}</span>
+  </div>
+  <h3 class="program-title">{html.escape(name)}</h3>
+  {org_html}
+  <p class="program-desc">{desc_html}</p>
+  {meta_html}
+  {actions_html}
+  {SIMILAR_SLOT}
+</div>
+"""
+
+
+def similar_html(
+    catalogue: Catalogue,
+    pos: int,
+    base: Optional[np.ndarray],
+    link_params: List[Tuple[str, str]],
+) -> str:
+    """"Similar programs" list for one card, built per session.
+
+    Straight from the neighbour table, keeping only programs in the
+    tenant's ``base``. Each link carries ``link_params`` (the session's
+    tenant only: a search or filter could exclude the neighbours listed).
+    """
+    cols = catalogue.cols
+    links = []
+    for other in catalogue.neighbours[pos]:
+        if other < 0 or (base is not None and not base[other]):
+            continue
+        other_row = catalogue.df.iloc[other]
+        other_name = sanitize_text_keep_smart(clean_cell(other_row[cols["PROGRAM_NAME"]]))
+        other_key = clean_cell(other_row[cols["KEY"]])
+        if other_name and other_key:
+            href = "?" + urlencode(sorted(link_params + [("similar", other_key)]))
+            links.append(
+                f'<li><a href="{html.escape(href)}" target="_self">{html.escape(other_name)}</a></li>'
+            )
+    if not links:
+        return ""
+    return (
+        '<details class="pf-similar"><summary>Similar programs</summary><ul>'
+        + "".join(links)
+        + "</ul></details>"
+    )
+
+
+def card_html(catalogue: Catalogue, pos: int) -> str:
+    """Card HTML, memoized per catalogue and date; cards do not depend on session state.
+
+    The similar-programs list does, so the cached HTML holds SIMILAR_SLOT
+    in its place.
+    """
+    cards = current_freshness(catalogue).cards
+    html_str = cards.get(pos)
+    if html_str is None:
+        html_str = build_card_html(catalogue, pos)
+        cards[pos] = html_str
+    return html_str
+
+
+# ---------------------- CACHE WARM-UP ----------------------
+
+# One canonical query string per line (the same form as the page URL, e.g.
+# "q=loan&region=Calgary"). Without the file, every single-pill selection
+# across the six facets is warmed.
+WARMUP_FILE = os.environ.get("PATHFINDING_WARMUP_FILE", "warmup_queries.txt")
+WARMUP_PAGE_SIZE = 25
+
+
+WarmupState = Tuple[str, Dict[str, List[str]], str, str]
+
+
+def warmup_states(catalogue: Catalogue) -> List[WarmupState]:
+    """(query, filters, sort, tenant id) for each view to warm."""
+    states: List[WarmupState] = [("", {}, "relevance", "")]
+    if os.path.exists(WARMUP_FILE):
+        with open(WARMUP_FILE, encoding="utf-8") as fh:
+            for line in fh:
+                line = line.strip().lstrip("?")
+                if not line or line.startswith("#"):
+                    continue
+                params = parse_qs(line)
+                sort = params.get("sort", ["relevance"])[0]
+                states.append(
+                    (
+                        params.get("q", [""])[0],
+                        parse_filter_params(lambda name: params.get(name, []), catalogue),
+                        sort if sort in SORT_OPTIONS else "relevance",
+                        params.get("tenant", [""])[0],
+                    )
+                )
+        return states
+
+    for session_key in FILTER_KEYS:
+        if session_key == "filter_funding_min":
+            continue
+        if session_key == "filter_funding_bucket":
+            vocab = FUNDING_BUCKETS
+        else:
+            vocab = catalogue.facets[session_key].vocab
+        for val in vocab:
+            states.append(("", {session_key: [val]}, "relevance", ""))
+    return states
+
+
+def warm_up(catalogue: Catalogue) -> None:
+    """Fill the result and card caches for popular views before serving."""
+    def search(catalogue: Catalogue, query: str) -> np.ndarray:
+        return query_mask(catalogue, query)
+
+    configs = shell.get_tenants()
+    for query, filters, sort, tenant_id in warmup_states(catalogue):
+        tenant = configs.get(tenant_id, tenants.DEFAULT_TENANT)
+        positions = find_results(catalogue, query, filters, sort, search=search, tenant=tenant)
+        for pos in positions[:WARMUP_PAGE_SIZE]:
+            card_html(catalogue, int(pos))
+
+
 # ---------------------- MAIN APP ----------------------
 
 
 def main():
     global COLS
 
-    embed_css()
-    embed_logo_html()
-
+    # Page config, CSS and header were painted before the heavy imports
+    tenant = shell.session_tenant()
     data_path = "Pathfinding_Master.xlsx"
-    df, col_map = load_data(data_path)
-    COLS = col_map
+    catalogue = ready_catalogue(data_path)
+    load_url_search_state()
 
     # Hero section
     st.markdown("## Find programs and supports for your Alberta business")
@@ -1099,21 +2738,51 @@ Scroll through cards that match your selections."""
 Use the website, email, phone, and favourite options to connect or save programs."""
         )
 
+    # Filled once the catalogue is ready; keeps the questions above the search row
+    prescreen_slot = st.container()
+
     col_search, col_sort, col_page = st.columns([3, 1, 1])
     with col_search:
         st.text_input(
             "Search programs",
             key="search_q",
             placeholder="Search by keyword, program name, organization, or description",
+            **live_search_kwargs(),
         )
+        if LIVE_SEARCH_SUPPORTED:
+            st.toggle(
+                "Search as you type",
+                key="search_live",
+                value=True,
+                help="Update results after a short pause in typing instead of waiting for Enter.",
+            )
     with col_sort:
-        sort_by = st.selectbox(
+        st.selectbox(
             "Sort results by",
-            ["Relevance", "Program name A to Z", "Most recently checked"],
-            index=0,
+            list(SORT_OPTIONS),
+            format_func=SORT_OPTIONS.get,
+            key="sort_by",
         )
     with col_page:
-        per_page = st.selectbox("Results per page", [10, 25, 50], index=1)
+        per_page = st.selectbox(
+            "Results per page",
+            PER_PAGE_OPTIONS,
+            key="per_page",
+        )
+
+    if catalogue is None:
+        # The first paint is done; poll until the background load finishes
+        st.info("Loading programs...")
+        time.sleep(CATALOGUE_POLL_SECONDS)
+        st.rerun()
+
+    df = catalogue.df
+    COLS = catalogue.cols
+    load_url_state(catalogue)
+    with prescreen_slot:
+        render_prescreen(catalogue)
+    with col_search:
+        render_suggestions(catalogue.suggest)
 
     st.markdown(
         "<p class='results-summary'>Tip: Search also matches similar terms and common spellings, not just exact words.</p>",
@@ -1121,50 +2790,35 @@ Use the website, email, phone, and favourite options to connect or save programs
     )
 
     # Build option lists with counts from the actual data
-    support_counts = Counter()
-    for cats in df["__support_cats"]:
-        support_counts.update(cats)
-    support_options = [
-        (name, f"{name} ({support_counts[name]})")
-        for name in sorted(support_counts.keys())
-    ]
-
-    audience_counts = Counter()
-    for cats in df["__audience_cats"]:
-        audience_counts.update(cats)
-    audience_options = [
-        (name, f"{name} ({audience_counts[name]})")
-        for name in sorted(audience_counts.keys())
-    ]
+    # Counted within the tenant's programs, so pills it cannot show are hidden
+    base = tenant_base(catalogue, tenant)
+
+    def facet_options(session_key: str) -> List[Tuple[str, str]]:
+        facet = catalogue.facets[session_key]
+        counts = facet.counts(base)
+        if session_key == "filter_region":
+            # Counted the way the filter matches: with the regions above it
+            region_rows = np.ones(len(df), dtype=bool) if base is None else base
+            counts = {
+                name: int((facet.mask(expand_regions([name])) & region_rows).sum())
+                for name in counts
+            }
+        return [
+            (name, f"{name} ({counts[name]})")
+            for name in sorted(counts)
+            if counts[name] > 0
+        ]
 
-    region_counts = Counter()
-    for cats in df["__region_cats"]:
-        region_counts.update(cats)
-    region_options = [
-        (name, f"{name} ({region_counts[name]})")
-        for name in sorted(region_counts.keys())
-    ]
+    support_options = facet_options("filter_support")
+    audience_options = facet_options("filter_audience")
+    region_options = facet_options("filter_region")
+    stage_options = facet_options("filter_stage")
 
-    stage_counts = Counter()
-    for cats in df["__stage_cats"]:
-        stage_counts.update(cats)
-    stage_options = [
-        (name, f"{name} ({stage_counts[name]})")
-        for name in sorted(stage_counts.keys())
-    ]
-
-    bucket_counts = Counter(df["__funding_bucket"].tolist())
-    funding_bucket_values = [
-        "Under 5K",
-        "5K to 25K",
-        "25K to 100K",
-        "100K to 500K",
-        "Over 500K",
-        UNKNOWN,
-    ]
+    buckets = df["__funding_bucket"] if base is None else df["__funding_bucket"][base]
+    bucket_counts = buckets.value_counts()
     funding_bucket_options = []
-    for b in funding_bucket_values:
-        count = bucket_counts.get(b, 0)
+    for b in FUNDING_BUCKETS:
+        count = int(bucket_counts.get(b, 0))
         if count > 0:
             if b == UNKNOWN:
                 label = f"Unknown / not stated ({count})"
@@ -1172,20 +2826,10 @@ Use the website, email, phone, and favourite options to connect or save programs
                 label = f"{add_dollar_signs(b)} ({count})"
             funding_bucket_options.append((b, label))
 
-    fund_type_counts = Counter()
-    for s in df["__fund_type_set"]:
-        fund_type_counts.update(s)
-    funding_type_values = [
-        "Grant",
-        "Loan",
-        "Tax Credit",
-        "Voucher or Rebate",
-        "Equity or Investment",
-        "Other Financing",
-    ]
+    fund_type_counts = catalogue.facets["filter_funding_type"].counts(base)
     funding_type_options = [
         (t, f"{t} ({fund_type_counts.get(t, 0)})")
-        for t in funding_type_values
+        for t in FUNDING_TYPES
         if fund_type_counts.get(t, 0) > 0
     ]
 
@@ -1194,6 +2838,7 @@ Use the website, email, phone, and favourite options to connect or save programs
         if st.button("Clear all filters"):
             clear_all_filters()
             st.rerun()
+        st.button("★ My saved programs", key="saved_open", on_click=open_saved_view)
 
         # 1. Stage
         render_filter_pills(
@@ -1223,6 +2868,7 @@ Use the website, email, phone, and favourite options to connect or save programs
                 funding_bucket_options,
                 "filter_funding_bucket",
             )
+        render_funding_min()
 
         # 5. Audience
         render_filter_pills(
@@ -1235,29 +2881,43 @@ Use the website, email, phone, and favourite options to connect or save programs
         # 6. Location at the bottom (unchanged)
         render_filter_pills(
             "Where is your business located?",
-            "",
+            "Programs offered across Alberta or Canada are included.",
             region_options,
             "filter_region",
         )
 
-    filtered, active_filters = apply_filters(df)
-    total = len(filtered)
+        if ADMIN_MODE:
+            render_quality_report(catalogue.quality)
+
+    positions, active_filters = apply_filters(catalogue)
+    key = view_key(
+        st.session_state.get("search_q", ""),
+        active_filters,
+        st.session_state.get("sort_by", "relevance"),
+    )
+    if st.session_state.get("_result_key") != key:
+        st.session_state["_result_key"] = key
+        st.session_state["page"] = 1
+
+    total = len(positions)
     if total == 0:
-        st.info(
-            "No programs match your current filters. Try clearing filters or broadening your search."
-        )
-        close_shell()
+        log_view(catalogue, key, positions, 1, positions)
+        sync_url_state()
+        if st.session_state.get("saved_view") is not None:
+            render_saved_banner(total)
+            st.info("You have not saved any programs yet. Select ☆ Save under a program to keep it here.")
+        else:
+            st.info(
+                "No programs match your current filters. Try clearing filters or broadening your search."
+            )
+        shell.close_shell()
         return
 
-    if sort_by == "Program name A to Z":
-        name_col = COLS["PROGRAM_NAME"]
-        filtered = filtered.sort_values(by=name_col, na_position="last")
-    elif sort_by == "Most recently checked":
-        filtered = filtered.sort_values("__fresh_days", ascending=True)
-
     page = st.session_state.get("page", 1)
     max_page = max(1, (total + per_page - 1) // per_page)
     page = max(1, min(page, max_page))
+    st.session_state["page"] = page
+    sync_url_state()
     start = (page - 1) * per_page
     end = start + per_page
 
@@ -1266,146 +2926,37 @@ Use the website, email, phone, and favourite options to connect or save programs
         unsafe_allow_html=True,
     )
 
+    render_similar_banner(catalogue)
+    render_saved_banner(total)
     render_chips(active_filters)
-
-    subset = filtered.iloc[start:end].copy()
-    for i, (_, row) in enumerate(subset.iterrows(), 1):
-        name = sanitize_text_keep_smart(str(row[COLS["PROGRAM_NAME"]] or ""))
-        org = sanitize_text_keep_smart(str(row[COLS["ORGANIZATION"]] or ""))
-        desc_full = str(row[COLS["DESCRIPTION"]] or "")
-        status = str(row[COLS["STATUS"]] or "")
-        fund_bucket_val = str(row.get("__funding_bucket") or "")
-        fund_type_set = row.get("__fund_type_set", set())
-        fresh_days = row.get("__fresh_days")
-        fresh_date = str(row.get("__fresh_date") or "")
-        fresh_label = freshness_label(fresh_days)
-
-        website = str(row.get(COLS["WEBSITE"]) or "").strip()
-        email_raw = str(row.get(COLS["EMAIL"]) or "").strip()
-        phone_raw = str(row.get(COLS["PHONE"]) or "").strip()
-
-        # Treat typical placeholders as "no phone"
-        if phone_raw.lower() in {"nan", "none", "na", "n/a", "not available", "not listed", "no phone"}:
-            phone_raw = ""
-
-        if (
-            "not publicly listed" in phone_raw.lower()
-            and "contact page" in phone_raw.lower()
-        ):
-            phone_raw = ""
-
-        phone_display_multi = format_phone_multi(phone_raw)
-        key = str(row.get(COLS["KEY"], f"k{i}"))
-
-        # Badge
-        badge_cls = "badge-open"
-        badge_label = "Operational"
-        if "closed" in status.lower():
-            badge_cls = "badge-closed"
-            badge_label = "Closed"
-        elif "paused" in status.lower():
-            badge_cls = "badge-paused"
-            badge_label = "Paused"
-
-        # Description (truncated, plain HTML-safe)
-        desc_short = truncate_for_card(desc_full)
-        desc_html = html.escape(desc_short)
-
-        # Funding amount display logic
-        fund_raw = sanitize_text_keep_smart(
-            str(row.get(COLS["FUNDING"]) or "").strip()
+    render_export(catalogue, positions)
+
+    shown = positions[start:end]
+    log_view(catalogue, key, positions, page, shown)
+    keys = catalogue.df[catalogue.cols["KEY"]].to_numpy()[shown]
+    link_params = [(k, v) for k, v in session_url_params() if k == "tenant"]
+    for pos, program_key in zip(shown, keys):
+        card = card_html(catalogue, int(pos)).replace(
+            SIMILAR_SLOT, similar_html(catalogue, int(pos), base, link_params)
         )
-        fund_label = ""
-        if fund_raw and "$" in fund_raw:
-            fund_label = fund_raw
-        elif fund_bucket_val and fund_bucket_val.strip().lower() != UNKNOWN.lower():
-            fund_label = add_dollar_signs(fund_bucket_val)
-
-        fund_type_label = ""
-        if isinstance(fund_type_set, set) and fund_type_set:
-            fund_type_label = ", ".join(sorted(fund_type_set))
-
-        if fund_label:
-            fund_line = f'<span class="kv"><strong>Funding available:</strong> {html.escape(fund_label)}</span>'
-        else:
-            fund_line = ""
+        st.markdown(card, unsafe_allow_html=True)
+        program_key = clean_cell(program_key)
+        if program_key:
+            render_favourite_toggle(int(pos), program_key)
 
-        fund_type_line = (
-            f'<span class="kv"><strong>Funding type:</strong> {html.escape(fund_type_label)}</span>'
-            if fund_type_label
-            else ""
-        )
+    render_pager(page, max_page)
+    shell.close_shell()
 
-        elig_text = drop_url_like(
-            sanitize_text_keep_smart(str(row.get(COLS["ELIGIBILITY"]) or ""))
-        )
-        elig_line = ""
-        if (
-            elig_text
-            and "description pending" not in elig_text.lower()
-            and "see website" not in elig_text.lower()
-        ):
-            elig_line = f'<span class="kv"><strong>Eligibility highlights:</strong> {html.escape(elig_text)}</span>'
 
-        meta_html_parts = [p for p in [fund_line, fund_type_line, elig_line] if p]
-        if meta_html_parts:
-            inner = " ".join(meta_html_parts)
-            meta_html = f'<div class="meta-strip">{inner}</div>'
-        else:
-            meta_html = (
-                '<p class="placeholder">Funding or eligibility details are not available in this view.</p>'
-            )
-
-        # Actions
-        actions: List[str] = []
-
-        if website:
-            url = (
-                website
-                if website.startswith(("http://", "https://"))
-                else f"https://{website}"
-            )
-            actions.append(f'<a href="{html.escape(url)}" target="_blank" rel="noopener">Website</a>')
-
-        email_label, email_href = parse_email_field(email_raw)
-        if email_href:
-            actions.append(f'<a href="{html.escape(email_href)}">Email</a>')
-        elif email_label:
-            actions.append(f'<span class="pf-action-muted">{html.escape(email_label)}</span>')
-
-        if phone_display_multi:
-            actions.append(
-                f'<span class="pf-action-muted">Call: {html.escape(phone_display_multi)}</span>'
-            )
-
-        # Favourite – static visual for now
-        actions.append('<span class="pf-action-muted">&#9734; Favourite</span>')
-
-        actions_html = ""
-        if actions:
-            actions_html = '<div class="pf-actions">' + " ".join(actions) + "</div>"
-
-        org_html = (
-            f'<div class="program-org">{html.escape(org)}</div>' if org else ""
-        )
-
-        card_html = f"""
-<div class="pf-card">
-  <div>
-    <span class="badge {badge_cls}">{badge_label}</span>
-    <span class="meta">Last checked: {html.escape(fresh_date) if fresh_date else "Not available"} - {html.escape(fresh_label)}</span>
-  </div>
-  <h3 class="program-title">{html.escape(name)}</h3>
-  {org_html}
-  <p class="program-desc">{desc_html}</p>
-  {meta_html}
-  {actions_html}
-</div>
-"""
-        st.markdown(card_html, unsafe_allow_html=True)
-
-    close_shell()
+def rerun_state() -> Dict[str, object]:
+    """Search state that tags a slow rerun's profile, in the page URL format."""
+    ctx = get_script_run_ctx()
+    return {
+        "session": ctx.session_id if ctx else "",
+        "params": urlencode(session_url_params()),
+    }
 
 
 if __name__ == "__main__":
-    main()
+    with profiling.profile_rerun(rerun_state):
+        main()
@@ -0,0 +1,187 @@
+"""Find duplicate and near-duplicate programs in the master workbook.
+
+Run from the repository root:
+
+    python dedupe.py                       # Pathfinding_Master.xlsx
+    python dedupe.py other.xlsx --out candidates.csv --threshold 88
+
+Rows are never compared all-against-all. Two kinds of blocking pick the
+pairs worth scoring:
+
+* sorted neighbourhoods: the catalogue is sorted on a few keys (name with
+  its words sorted, organization + name, reversed name) and each program
+  is compared with its WINDOW nearest neighbours under each key;
+* organization blocks: programs from the same normalized organization
+  are compared with each other, for organizations with at most MAX_BLOCK
+  programs.
+
+Candidate pairs are scored in batches with rapidfuzz (cpdist/cdist on all
+cores), so the work is roughly n * WINDOW comparisons rather than n
+squared. Pairs whose names score at or above the threshold and that also
+share an organization, website or key are written out as merge
+candidates, most similar first.
+"""
+
+import argparse
+import re
+import sys
+import time
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+from rapidfuzz import fuzz, process
+
+from app import clean_cell, fold_text, load_data, sanitize_text_keep_smart
+
+NAME_THRESHOLD = 90
+ORG_THRESHOLD = 85
+WINDOW = 10
+MAX_BLOCK = 50
+
+
+def normalize_name(s) -> str:
+    s = fold_text(sanitize_text_keep_smart(clean_cell(s)))
+    s = re.sub(r"\([^)]*\)", " ", s)  # drop "(ACANEA)"-style acronyms
+    s = re.sub(r"[^a-z0-9]+", " ", s)
+    return re.sub(r"\s+", " ", s).strip()
+
+
+def website_host(url: str) -> str:
+    host = url.split("://", 1)[-1].split("/", 1)[0].lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+def neighbourhood_pairs(
+    names: np.ndarray, sort_keys: List[str], threshold: int, window: int = WINDOW
+) -> Dict[Tuple[int, int], float]:
+    """Score each row against its ``window`` successors in ``sort_keys`` order."""
+    pairs: Dict[Tuple[int, int], float] = {}
+    order = np.argsort(np.asarray(sort_keys, dtype=object), kind="stable")
+    for offset in range(1, min(window, len(order) - 1) + 1):
+        left, right = order[:-offset], order[offset:]
+        scores = process.cpdist(
+            names[left],
+            names[right],
+            scorer=fuzz.token_sort_ratio,
+            score_cutoff=threshold,
+            workers=-1,
+        )
+        for i in np.flatnonzero(scores):
+            a, b = sorted((int(left[i]), int(right[i])))
+            pairs[(a, b)] = float(scores[i])
+    return pairs
+
+
+def organization_pairs(
+    names: np.ndarray, orgs: List[str], threshold: int
+) -> Dict[Tuple[int, int], float]:
+    """Score all pairs inside each organization with at most MAX_BLOCK programs."""
+    by_org: Dict[str, List[int]] = defaultdict(list)
+    for pos, org in enumerate(orgs):
+        if org:
+            by_org[org].append(pos)
+
+    pairs: Dict[Tuple[int, int], float] = {}
+    for members in by_org.values():
+        if not 2 <= len(members) <= MAX_BLOCK:
+            continue
+        block = names[members]
+        scores = process.cdist(
+            block,
+            block,
+            scorer=fuzz.token_sort_ratio,
+            score_cutoff=threshold,
+            workers=-1,
+        )
+        for a, b in zip(*np.nonzero(np.triu(scores, k=1))):
+            pairs[(members[a], members[b])] = float(scores[a, b])
+    return pairs
+
+
+def find_candidates(
+    df: pd.DataFrame, col_map: Dict[str, str], threshold: int = NAME_THRESHOLD
+) -> pd.DataFrame:
+    raw_names = df[col_map["PROGRAM_NAME"]].map(clean_cell).tolist()
+    raw_orgs = df[col_map["ORGANIZATION"]].map(clean_cell).tolist()
+    keys = df[col_map["KEY"]].map(clean_cell).tolist()
+    hosts = [website_host(u) for u in df["__website_url"]]
+    normalized = {s: normalize_name(s) for s in set(raw_names) | set(raw_orgs)}
+    names = np.asarray([normalized[s] for s in raw_names], dtype=object)
+    orgs = [normalized[s] for s in raw_orgs]
+
+    pairs = organization_pairs(names, orgs, threshold)
+    for sort_keys in [
+        [" ".join(sorted(n.split())) for n in names],
+        [f"{o} {n}" for o, n in zip(orgs, names)],
+        [n[::-1] for n in names],
+    ]:
+        for key, score in neighbourhood_pairs(names, sort_keys, threshold).items():
+            pairs[key] = max(pairs.get(key, 0.0), score)
+
+    # Identical keys are duplicates whatever their names say
+    same_key: Dict[str, List[int]] = defaultdict(list)
+    for pos, key in enumerate(keys):
+        if key:
+            same_key[key].append(pos)
+    for members in same_key.values():
+        for i, a in enumerate(members):
+            for b in members[i + 1 :]:
+                pairs.setdefault((a, b), float(fuzz.token_sort_ratio(names[a], names[b])))
+
+    rows = []
+    for (a, b), name_score in pairs.items():
+        org_score = fuzz.token_sort_ratio(orgs[a], orgs[b]) if orgs[a] and orgs[b] else 0.0
+        same_site = bool(hosts[a]) and hosts[a] == hosts[b]
+        same_key_flag = bool(keys[a]) and keys[a] == keys[b]
+        if not (same_key_flag or org_score >= ORG_THRESHOLD or same_site):
+            continue
+        rows.append(
+            {
+                "row_a": a + 2,
+                "row_b": b + 2,
+                "name_score": round(name_score, 1),
+                "org_score": round(float(org_score), 1),
+                "same_website": same_site,
+                "same_key": same_key_flag,
+                "name_a": raw_names[a],
+                "name_b": raw_names[b],
+                "org_a": raw_orgs[a],
+                "org_b": raw_orgs[b],
+                "key_a": keys[a],
+                "key_b": keys[b],
+            }
+        )
+
+    out = pd.DataFrame(rows)
+    if out.empty:
+        return out
+    return out.sort_values(
+        ["name_score", "org_score", "row_a"], ascending=[False, False, True]
+    ).reset_index(drop=True)
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("path", nargs="?", default="Pathfinding_Master.xlsx")
+    parser.add_argument("--out", default="merge_candidates.csv")
+    parser.add_argument("--threshold", type=int, default=NAME_THRESHOLD)
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    df, col_map = load_data(args.path)
+    loaded = time.perf_counter()
+    candidates = find_candidates(df, col_map, args.threshold)
+    done = time.perf_counter()
+
+    candidates.to_csv(args.out, index=False)
+    print(
+        f"{len(candidates)} merge candidates among {len(df)} programs "
+        f"(load {loaded - started:.1f}s, match {done - loaded:.1f}s) -> {args.out}"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
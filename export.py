@@ -0,0 +1,128 @@
+"""Download the current result set as CSV, XLSX or JSON.
+
+Rows are fetched from the catalogue in chunks of row positions and
+written straight into the file's bytes, so no filtered copy of the
+catalogue frame is built. The finished file itself is held in memory:
+Streamlit keeps a download's whole payload in memory when serving it.
+"""
+
+import csv
+import io
+import json
+from typing import Callable, Dict, IO, Iterator, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+EXPORT_CHUNK = 1000
+
+# Label shown in the UI -> (file extension, MIME type)
+EXPORT_FORMATS: Dict[str, Tuple[str, str]] = {
+    "CSV": ("csv", "text/csv"),
+    "Excel (XLSX)": (
+        "xlsx",
+        "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    ),
+    "JSON": ("json", "application/json"),
+}
+
+# Header in the export -> logical column in the column map
+EXPORT_COLUMNS: List[Tuple[str, str]] = [
+    ("Program Name", "PROGRAM_NAME"),
+    ("Organization", "ORGANIZATION"),
+    ("Description", "DESCRIPTION"),
+    ("Eligibility", "ELIGIBILITY"),
+    ("Website", "WEBSITE"),
+    ("Email", "EMAIL"),
+    ("Phone", "PHONE"),
+    ("Region", "REGION"),
+    ("Funding Amount", "FUNDING"),
+    ("Operational Status", "STATUS"),
+    ("Last Checked", "LAST_CHECKED"),
+    ("Key", "KEY"),
+]
+
+
+def iter_chunks(
+    rows: Callable[[np.ndarray], pd.DataFrame],
+    cols: Dict[str, str],
+    positions: np.ndarray,
+    chunk: int = EXPORT_CHUNK,
+) -> Iterator[List[List[str]]]:
+    """Yield rows of export values, ``chunk`` row positions at a time.
+
+    ``rows`` returns the catalogue rows at the given positions, in order.
+    """
+    names = [cols[key] for _label, key in EXPORT_COLUMNS]
+    for start in range(0, len(positions), chunk):
+        block = rows(positions[start : start + chunk])[names]
+        yield [
+            ["" if pd.isna(v) else str(v) for v in values]
+            for values in block.itertuples(index=False, name=None)
+        ]
+
+
+class _TextSink:
+    """Minimal text adapter so csv.writer can write UTF-8 into a binary file."""
+
+    def __init__(self, fh: IO[bytes]):
+        self._fh = fh
+
+    def write(self, s: str) -> int:
+        return self._fh.write(s.encode("utf-8"))
+
+
+def write_csv(fh: IO[bytes], chunks: Iterator[List[List[str]]]) -> None:
+    text = _TextSink(fh)
+    text.write("\ufeff")  # lets Excel detect UTF-8 (accented French names)
+    writer = csv.writer(text)
+    writer.writerow([label for label, _key in EXPORT_COLUMNS])
+    for rows in chunks:
+        writer.writerows(rows)
+
+
+def write_json(fh: IO[bytes], chunks: Iterator[List[List[str]]]) -> None:
+    labels = [label for label, _key in EXPORT_COLUMNS]
+    fh.write(b"[")
+    first = True
+    for rows in chunks:
+        for values in rows:
+            if not first:
+                fh.write(b",")
+            fh.write(b"\n")
+            fh.write(json.dumps(dict(zip(labels, values)), ensure_ascii=False).encode("utf-8"))
+            first = False
+    fh.write(b"\n]\n")
+
+
+def write_xlsx(fh: IO[bytes], chunks: Iterator[List[List[str]]]) -> None:
+    # Write-only workbooks stream rows out instead of keeping a cell grid.
+    from openpyxl import Workbook
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Programs")
+    ws.append([label for label, _key in EXPORT_COLUMNS])
+    for rows in chunks:
+        for values in rows:
+            ws.append(values)
+    wb.save(fh)
+
+
+def export_results(
+    rows: Callable[[np.ndarray], pd.DataFrame],
+    cols: Dict[str, str],
+    positions: np.ndarray,
+    fmt: str,
+) -> bytes:
+    """The file holding the rows at ``positions``, in that order."""
+    ext, _mime = EXPORT_FORMATS[fmt]
+    fh = io.BytesIO()
+    chunks = iter_chunks(rows, cols, positions)
+    if ext == "csv":
+        write_csv(fh, chunks)
+    elif ext == "xlsx":
+        write_xlsx(fh, chunks)
+    else:
+        write_json(fh, chunks)
+    return fh.getvalue()
+
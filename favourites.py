@@ -0,0 +1,223 @@
+"""Saved programs ("favourites"), per user, kept in a local SQLite file.
+
+Each user's saved program KEYs are held in memory as a set, so marking a
+card as saved is a hash lookup. A toggle updates the set at once and
+queues the change. A background thread writes the queue every
+FLUSH_SECONDS, or sooner once FLUSH_BATCH changes are waiting, in one
+transaction, so a click never waits on disk. A returning user's set is
+read from the file, outside the store's lock, the first time this process
+sees that user; ids minted by ``new_user`` start empty without a read.
+Only the CACHE_USERS most recently seen users are kept in memory.
+Processes sharing the file see each other's changes only for users they
+have not loaded yet.
+
+Set PATHFINDING_FAVOURITES_DB to keep the file somewhere other than
+favourites.sqlite.
+"""
+
+import atexit
+import os
+import secrets
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, FrozenSet, Optional, Set, Tuple
+
+FAVOURITES_DB = os.environ.get("PATHFINDING_FAVOURITES_DB", "favourites.sqlite")
+FLUSH_BATCH = 100
+FLUSH_SECONDS = 2.0
+CACHE_USERS = 10000
+
+SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS favourites ("
+    " user TEXT NOT NULL, key TEXT NOT NULL, saved_at REAL NOT NULL,"
+    " PRIMARY KEY (user, key)) WITHOUT ROWID"
+)
+
+
+class FavouriteStore:
+    """In-memory sets of saved keys per user, written back to SQLite in batches."""
+
+    def __init__(
+        self,
+        path: str,
+        batch: int = FLUSH_BATCH,
+        interval: float = FLUSH_SECONDS,
+        cache_users: int = CACHE_USERS,
+    ):
+        self.path = path
+        self.batch = batch
+        self.interval = interval
+        self.cache_users = cache_users
+        self._sets: "OrderedDict[str, Set[str]]" = OrderedDict()
+        # (user, key) -> time saved, or None once removed; last change wins.
+        # _writing holds the batch being written, _flushes counts finished writes.
+        self._pending: Dict[Tuple[str, str], Optional[float]] = {}
+        self._writing: Dict[Tuple[str, str], Optional[float]] = {}
+        self._flushes = 0
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=10)
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute(SCHEMA)
+        return conn
+
+    def _read(self, user: str) -> Set[str]:
+        """The user's saved keys on disk; empty when there is no file yet."""
+        if not os.path.exists(self.path):
+            return set()
+        try:
+            conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True, timeout=10)
+            try:
+                rows = conn.execute(
+                    "SELECT key FROM favourites WHERE user = ?", (user,)
+                ).fetchall()
+            finally:
+                conn.close()
+        except sqlite3.Error:
+            return set()  # start empty rather than fail the page
+        return {key for (key,) in rows}
+
+    def _cache(self, user: str, keys: Set[str]) -> Set[str]:
+        """Keep ``keys`` as the user's set, evicting the least recently seen.
+
+        Call with the lock held.
+        """
+        self._sets[user] = keys
+        self._sets.move_to_end(user)
+        while len(self._sets) > self.cache_users:
+            self._sets.popitem(last=False)
+        return keys
+
+    def _user_set(self, user: str) -> Set[str]:
+        """The user's set, read from the file on first use. Call with the lock held.
+
+        The read itself runs with the lock released. Queued and in-flight
+        changes are applied on top of it, and it is repeated if a write
+        finished meanwhile.
+        """
+        while True:
+            keys = self._sets.get(user)
+            if keys is not None:
+                self._sets.move_to_end(user)
+                return keys
+            flushes = self._flushes
+            self._lock.release()
+            try:
+                keys = self._read(user)
+            finally:
+                self._lock.acquire()
+            if self._flushes != flushes:
+                continue
+            if user in self._sets:
+                continue  # loaded by another session meanwhile
+            for changes in (self._writing, self._pending):
+                for (change_user, key), saved_at in changes.items():
+                    if change_user == user:
+                        if saved_at is None:
+                            keys.discard(key)
+                        else:
+                            keys.add(key)
+            return self._cache(user, keys)
+
+    def new_user(self) -> str:
+        """A fresh random user id (32 hex digits); its empty set needs no read."""
+        user = secrets.token_hex(16)
+        with self._lock:
+            self._cache(user, set())
+        return user
+
+    def keys(self, user: str) -> FrozenSet[str]:
+        with self._lock:
+            return frozenset(self._user_set(user))
+
+    def is_saved(self, user: str, key: str) -> bool:
+        with self._lock:
+            return key in self._user_set(user)
+
+    def toggle(self, user: str, key: str) -> bool:
+        """Save or unsave ``key`` for ``user``; returns whether it is now saved."""
+        with self._lock:
+            keys = self._user_set(user)
+            saved = key not in keys
+            if saved:
+                keys.add(key)
+            else:
+                keys.discard(key)
+            self._pending[(user, key)] = time.time() if saved else None
+            pending = len(self._pending)
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="favourites-flush", daemon=True
+                )
+                self._thread.start()
+        if pending >= self.batch:
+            self._wake.set()
+        return saved
+
+    def flush(self) -> None:
+        """Write every queued change in one transaction.
+
+        On failure the changes go back on the queue (unless newer ones
+        arrived meanwhile) and the error is raised.
+        """
+        with self._write_lock:
+            with self._lock:
+                changes = self._pending
+                self._pending = {}
+                self._writing = changes
+            if not changes:
+                return
+            saves = [(u, k, t) for (u, k), t in changes.items() if t is not None]
+            removals = [(u, k) for (u, k), t in changes.items() if t is None]
+            try:
+                conn = self._connect()
+                try:
+                    with conn:
+                        conn.executemany(
+                            "INSERT OR REPLACE INTO favourites (user, key, saved_at)"
+                            " VALUES (?, ?, ?)",
+                            saves,
+                        )
+                        conn.executemany(
+                            "DELETE FROM favourites WHERE user = ? AND key = ?", removals
+                        )
+                finally:
+                    conn.close()
+            except sqlite3.Error:
+                with self._lock:
+                    for change, saved_at in changes.items():
+                        self._pending.setdefault(change, saved_at)
+                    self._writing = {}
+                raise
+            with self._lock:
+                self._writing = {}
+                self._flushes += 1
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except sqlite3.Error:
+                pass  # kept on the queue and retried on the next flush
+
+
+_store: Optional[FavouriteStore] = None
+_store_lock = threading.Lock()
+
+
+def store() -> FavouriteStore:
+    """The process-wide favourites store, shared by every session."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = FavouriteStore(FAVOURITES_DB)
+            atexit.register(_store.flush)
+        return _store
@@ -0,0 +1,352 @@
+"""Load test: simulated browser sessions against a local app server.
+
+Starts ``streamlit run app.py`` on a free local port and connects
+simulated users to it over the same websocket protocol the browser uses.
+Users type queries, toggle filter pills (the ``render_filter_pills``
+buttons), save programs (a fragment rerun) and page through results, pausing for a random think time
+between actions. Each concurrency level reports reruns per second, rerun
+latency percentiles (request sent to script finished), errors, and the
+server's memory per connected session. Run from the repository root;
+nothing leaves the machine:
+
+    python load_test.py                         # 1, 2, 4 and 8 users, 30 s each
+    python load_test.py --users 1 5 10 20 --duration 60 --think 2
+    python load_test.py --url ws://127.0.0.1:8501 --pid 12345
+
+``--url`` tests a server that is already running; give ``--pid`` to also
+report its memory. The server started here has usage logging turned off
+and keeps saved programs in a temporary file, so test traffic ends up
+neither in usage_events.jsonl nor in favourites.sqlite.
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import numpy as np
+import websockets
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+QUERIES = [
+    "loan", "grant", "export", "women", "indigenous", "youth", "training",
+    "mentorship", "innovation", "agriculture", "calgary", "startup", "tax credit",
+    "financement", "small business loan", "research",
+]
+# Relative weights of the actions a simulated user takes
+ACTIONS = {"search": 3, "pill": 4, "page": 2, "save": 1, "clear": 1}
+RUN_TIMEOUT = 120.0
+SERVER_START_TIMEOUT = 60.0
+FINISHED_OK = {
+    ForwardMsg.ScriptFinishedStatus.FINISHED_SUCCESSFULLY,
+    ForwardMsg.ScriptFinishedStatus.FINISHED_FRAGMENT_RUN_SUCCESSFULLY,
+}
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(port: int, favourites_db: str) -> subprocess.Popen:
+    """``streamlit run app.py`` on ``port``, returned once it answers health checks.
+
+    Saved programs go to ``favourites_db``, never the real favourites file.
+    """
+    env = {
+        **os.environ,
+        "PATHFINDING_ANALYTICS": "0",
+        "PATHFINDING_FAVOURITES_DB": favourites_db,
+    }
+    proc = subprocess.Popen(
+        [
+            sys.executable, "-m", "streamlit", "run", "app.py",
+            "--server.headless", "true",
+            "--server.port", str(port),
+            "--server.address", "127.0.0.1",
+            "--browser.gatherUsageStats", "false",
+        ],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + SERVER_START_TIMEOUT
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/_stcore/health", timeout=1):
+                return proc
+        except OSError:
+            if proc.poll() is not None:
+                break
+            time.sleep(0.5)
+    proc.kill()
+    raise RuntimeError("The app server did not start")
+
+
+def rss_bytes(pid: Optional[int]) -> Optional[int]:
+    """Resident memory of a process, from /proc (None where unavailable)."""
+    if pid is None:
+        return None
+    try:
+        with open(f"/proc/{pid}/status") as fh:
+            for line in fh:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+@dataclass
+class Widget:
+    kind: str
+    id: str
+    label: str
+    disabled: bool
+    fragment_id: str = ""
+
+
+class Session:
+    """One simulated browser tab: a websocket session that reruns the app script."""
+
+    def __init__(self, url: str, rng: random.Random, think: float):
+        self.url = url.rstrip("/") + "/_stcore/stream"
+        self.rng = rng
+        self.think = think
+        self.ws = None
+        self.query_string = ""
+        self.search = ""
+        self.widgets: Dict[str, Widget] = {}
+
+    async def connect(self) -> float:
+        self.ws = await websockets.connect(self.url, subprotocols=["streamlit"], max_size=None)
+        return await self.rerun()
+
+    async def close(self) -> None:
+        if self.ws is not None:
+            await self.ws.close()
+
+    async def rerun(self, trigger: Optional[str] = None, search: Optional[str] = None) -> float:
+        """Send one rerun (optionally clicking a button) and wait for it to finish.
+
+        A button inside a fragment reruns only that fragment, as in the browser.
+        """
+        if search is not None:
+            self.search = search
+        fragment_id = self.widgets[trigger].fragment_id if trigger is not None else ""
+        msg = BackMsg()
+        msg.rerun_script.query_string = self.query_string
+        msg.rerun_script.fragment_id = fragment_id
+        states = msg.rerun_script.widget_states.widgets
+        box = self.widgets.get("search_q")
+        if box is not None:
+            state = states.add()
+            state.id = box.id
+            state.string_value = self.search
+        if trigger is not None:
+            state = states.add()
+            state.id = self.widgets[trigger].id
+            state.trigger_value = True
+
+        start = time.perf_counter()
+        await self.ws.send(msg.SerializeToString())
+        widgets: Dict[str, Widget] = {}
+        failed = False
+        while True:
+            fwd = ForwardMsg()
+            fwd.ParseFromString(await asyncio.wait_for(self.ws.recv(), RUN_TIMEOUT))
+            kind = fwd.WhichOneof("type")
+            if kind == "delta" and fwd.delta.WhichOneof("type") == "new_element":
+                element = fwd.delta.new_element
+                etype = element.WhichOneof("type")
+                if etype == "exception":
+                    failed = True
+                proto = getattr(element, etype)
+                wid = getattr(proto, "id", "")
+                if wid:
+                    # "$$ID-<hash>-<key>"; unkeyed widgets end in "None"
+                    key = wid.split("-", 2)[-1]
+                    label = getattr(proto, "label", "")
+                    widgets[label if key == "None" else key] = Widget(
+                        etype, wid, label, getattr(proto, "disabled", False), fwd.delta.fragment_id
+                    )
+            elif kind == "page_info_changed":
+                self.query_string = fwd.page_info_changed.query_string
+            elif kind == "script_finished":
+                if fwd.script_finished == ForwardMsg.ScriptFinishedStatus.FINISHED_EARLY_FOR_RERUN:
+                    # The script called st.rerun(); wait for the run that follows
+                    widgets = {}
+                    continue
+                failed = failed or fwd.script_finished not in FINISHED_OK
+                break
+        latency = time.perf_counter() - start
+        if fragment_id:
+            # Only the fragment was redrawn; the rest of the page is unchanged
+            self.widgets.update(widgets)
+        else:
+            self.widgets = widgets
+        if failed:
+            raise RuntimeError("rerun failed")
+        return latency
+
+    async def step(self) -> Optional[float]:
+        """Take one weighted random action; None when it was not possible."""
+        action = self.rng.choices(list(ACTIONS), weights=list(ACTIONS.values()))[0]
+        if action == "search":
+            return await self.rerun(search=self.rng.choice(QUERIES))
+        if action == "pill":
+            pills = [k for k, w in self.widgets.items() if k.startswith("filter_") and w.kind == "button"]
+            if pills:
+                return await self.rerun(trigger=self.rng.choice(pills))
+        if action == "page":
+            pager = self.widgets.get("page_next")
+            if pager is not None and not pager.disabled:
+                return await self.rerun(trigger="page_next")
+        if action == "save":
+            saves = [k for k, w in self.widgets.items() if k.startswith("fav_") and w.fragment_id]
+            if saves:
+                return await self.rerun(trigger=self.rng.choice(saves))
+        if action == "clear" and "Clear all filters" in self.widgets:
+            self.search = ""
+            return await self.rerun(trigger="Clear all filters")
+        return None
+
+    async def pause(self) -> None:
+        if self.think > 0:
+            await asyncio.sleep(self.rng.expovariate(1.0 / self.think))
+
+
+@dataclass
+class LevelResult:
+    users: int
+    duration: float
+    latencies: List[float] = field(default_factory=list)
+    errors: int = 0
+    rss_before: Optional[int] = None
+    rss_during: Optional[int] = None
+
+
+async def run_level(
+    url: str, users: int, duration: float, think: float, seed: int, pid: Optional[int]
+) -> LevelResult:
+    result = LevelResult(users=users, duration=duration, rss_before=rss_bytes(pid))
+    started = time.monotonic()
+    deadline = started + duration
+
+    async def user(n: int) -> Optional[Session]:
+        session = Session(url, random.Random(seed * 1000 + n), think)
+        try:
+            result.latencies.append(await session.connect())
+        except Exception:
+            result.errors += 1
+            await session.close()
+            return None
+        while time.monotonic() < deadline:
+            await session.pause()
+            try:
+                latency = await session.step()
+            except Exception:
+                result.errors += 1
+                continue
+            if latency is not None:
+                result.latencies.append(latency)
+        return session
+
+    sessions = await asyncio.gather(*(user(n) for n in range(users)))
+    # Includes the reruns still in flight at the deadline
+    result.duration = time.monotonic() - started
+    # Measured while every session is still connected
+    result.rss_during = rss_bytes(pid)
+    for session in sessions:
+        if session is not None:
+            await session.close()
+    return result
+
+
+def print_results(results: List[LevelResult]) -> None:
+    header = ("users", "reruns", "reruns/s", "p50 ms", "p90 ms", "p99 ms", "max ms", "errors", "MB/session")
+    rows = []
+    for r in results:
+        lat = np.asarray(r.latencies) * 1000
+        p50, p90, p99 = np.percentile(lat, [50, 90, 99]) if len(lat) else (0, 0, 0)
+        if r.rss_before is None or r.rss_during is None:
+            per_session = "n/a"
+        else:
+            per_session = f"{(r.rss_during - r.rss_before) / r.users / 2**20:.1f}"
+        rows.append(
+            (
+                r.users,
+                len(lat),
+                f"{len(lat) / r.duration:.1f}",
+                f"{p50:.0f}",
+                f"{p90:.0f}",
+                f"{p99:.0f}",
+                f"{lat.max() if len(lat) else 0:.0f}",
+                r.errors,
+                per_session,
+            )
+        )
+    table = [tuple(str(c) for c in header)] + [tuple(str(c) for c in r) for r in rows]
+    widths = [max(len(r[i]) for r in table) for i in range(len(header))]
+    for r in table:
+        print("  ".join(c.rjust(w) for c, w in zip(r, widths)))
+
+
+async def run(args: argparse.Namespace, url: str, pid: Optional[int]) -> List[LevelResult]:
+    # The first session loads the catalogue and warms its caches
+    print("Loading the catalogue...", file=sys.stderr)
+    first = Session(url, random.Random(args.seed), 0)
+    await first.connect()
+    await first.close()
+    rss = rss_bytes(pid)
+    if rss is not None:
+        print(f"Server memory after load: {rss / 2**20:.0f} MB", file=sys.stderr)
+
+    results = []
+    for users in args.users:
+        print(f"{users} users for {args.duration:.0f} s...", file=sys.stderr)
+        results.append(await run_level(url, users, args.duration, args.think, args.seed, pid))
+    return results
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds per level")
+    parser.add_argument("--think", type=float, default=1.0, help="mean think time, seconds")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--url", default=None, help="websocket URL of a running server")
+    parser.add_argument("--pid", type=int, default=None, help="process id of that server")
+    args = parser.parse_args(argv)
+
+    server = None
+    scratch = tempfile.TemporaryDirectory(prefix="load-test-")
+    if args.url:
+        url, pid = args.url, args.pid
+    else:
+        port = free_port()
+        server = start_server(port, os.path.join(scratch.name, "favourites.sqlite"))
+        url, pid = f"ws://127.0.0.1:{port}", server.pid
+    try:
+        results = asyncio.run(run(args, url, pid))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+        scratch.cleanup()
+    print_results(results)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,126 @@
+"""Profiles of slow reruns: cProfile stats plus a tracemalloc top-N.
+
+A small, random share of reruns (PATHFINDING_PROFILE_RATE, default 2%)
+runs under cProfile and tracemalloc. When such a rerun takes longer than
+PATHFINDING_PROFILE_BUDGET_MS (default 1500), two files are written to
+PATHFINDING_PROFILE_DIR (default ``profiles/``):
+
+* ``<stamp>.prof``: cProfile stats, for ``python -m pstats`` or snakeviz;
+* ``<stamp>.txt``: the search state that caused the rerun, the slowest
+  functions by cumulative time and the lines that allocated the most.
+
+Only the newest PATHFINDING_PROFILE_KEEP profiles (default 50) are kept.
+Every rerun is timed, which costs next to nothing, and every slow rerun
+is recorded in the usage log as a ``slow_rerun`` event with its state, so
+one that was not sampled can still be reproduced. Only one rerun is
+profiled at a time, because tracemalloc traces the whole process. Set the
+rate to 0 to turn profiling off.
+"""
+
+import cProfile
+import glob
+import io
+import os
+import pstats
+import random
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, Optional
+
+PROFILE_RATE = float(os.environ.get("PATHFINDING_PROFILE_RATE", "0.02"))
+PROFILE_BUDGET_MS = float(os.environ.get("PATHFINDING_PROFILE_BUDGET_MS", "1500"))
+PROFILE_DIR = os.environ.get("PATHFINDING_PROFILE_DIR", "profiles")
+PROFILE_KEEP = int(os.environ.get("PATHFINDING_PROFILE_KEEP", "50"))
+PROFILE_TOP = 25
+TRACE_FRAMES = 5
+
+_profiling = threading.Lock()
+
+
+def write_profile(
+    profiler: cProfile.Profile,
+    snapshot: tracemalloc.Snapshot,
+    peak: int,
+    elapsed_ms: float,
+    state: Dict[str, object],
+    directory: str = PROFILE_DIR,
+) -> str:
+    """Write the .prof and .txt pair for one slow rerun; returns the file stem."""
+    os.makedirs(directory, exist_ok=True)
+    stamp = time.strftime("%Y%m%d-%H%M%S") + f"-{int(elapsed_ms)}ms-{os.getpid()}"
+    stem = os.path.join(directory, stamp)
+    profiler.dump_stats(stem + ".prof")
+
+    out = io.StringIO()
+    out.write(f"Rerun took {elapsed_ms:.0f} ms (budget {PROFILE_BUDGET_MS:.0f} ms)\n")
+    for name, value in state.items():
+        out.write(f"{name}: {value}\n")
+    out.write(f"Peak traced memory: {peak / 2**20:.1f} MB\n\n")
+    pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(PROFILE_TOP)
+    out.write(f"\nTop {PROFILE_TOP} allocating lines (still allocated at the end of the rerun)\n")
+    for stat in snapshot.statistics("lineno")[:PROFILE_TOP]:
+        out.write(f"{stat}\n")
+    with open(stem + ".txt", "w", encoding="utf-8") as fh:
+        fh.write(out.getvalue())
+
+    rotate(directory)
+    return stem
+
+
+def rotate(directory: str = PROFILE_DIR, keep: int = PROFILE_KEEP) -> None:
+    """Delete all but the newest ``keep`` profiles."""
+    stems = sorted(
+        {os.path.splitext(p)[0] for p in glob.glob(os.path.join(directory, "*.prof"))},
+        key=lambda s: os.path.getmtime(s + ".prof"),
+    )
+    for stem in stems[: max(len(stems) - keep, 0)]:
+        for ext in (".prof", ".txt"):
+            try:
+                os.remove(stem + ext)
+            except OSError:
+                pass
+
+
+@contextmanager
+def profile_rerun(describe: Callable[[], Dict[str, object]]) -> Iterator[None]:
+    """Time one script run and keep a profile of it when it was sampled and slow.
+
+    ``describe`` is called only for slow reruns, after the run, and returns
+    the search state to tag the profile with.
+    """
+    sampled = (
+        PROFILE_RATE > 0
+        and random.random() < PROFILE_RATE
+        and _profiling.acquire(blocking=False)
+    )
+    profiler: Optional[cProfile.Profile] = None
+    if sampled:
+        tracemalloc.start(TRACE_FRAMES)
+        profiler = cProfile.Profile()
+        profiler.enable()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        if profiler is not None:
+            profiler.disable()
+        slow = elapsed_ms > PROFILE_BUDGET_MS
+        state = describe() if slow else {}
+        stem = ""
+        if profiler is not None:
+            snapshot = tracemalloc.take_snapshot() if slow else None
+            _size, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            _profiling.release()
+            if slow:
+                try:
+                    stem = write_profile(profiler, snapshot, peak, elapsed_ms, state)
+                except OSError:
+                    pass  # profiling must never take the app down
+        if slow:
+            import analytics
+
+            analytics.record("slow_rerun", ms=round(elapsed_ms), profile=stem, **state)
@@ -0,0 +1,112 @@
+"""Page chrome: page config, CSS and the tenant's branded header.
+
+This module imports only Streamlit and the standard library, so app.py can
+paint the chrome before it imports pandas and NumPy and before the
+catalogue has loaded. On a cold start the header shows straight away.
+
+The stylesheet and logo live in static/ and are served by Streamlit's
+static file serving (.streamlit/config.toml). Their URLs carry a hash of
+the file's content, so a browser loads each version once.
+"""
+
+import hashlib
+import html
+import os
+from typing import Dict
+
+import streamlit as st
+
+import tenants
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
+STATIC_URL = "app/static"
+ASSET_HASH_LENGTH = 12
+
+
+# ---------------------- TENANTS ----------------------
+@st.cache_resource
+def get_tenants() -> Dict[str, tenants.Tenant]:
+    """Tenant configurations, read once per process."""
+    return tenants.load_tenants()
+
+
+def session_tenant() -> tenants.Tenant:
+    """The session's tenant, chosen on its first run and kept for the session."""
+    configs = get_tenants()
+    if "tenant" not in st.session_state:
+        st.session_state["tenant"] = tenants.resolve_tenant(
+            configs, st.query_params.get("tenant"), st.context.headers.get("Host")
+        ).id
+    return configs.get(st.session_state["tenant"], tenants.DEFAULT_TENANT)
+
+
+# ---------------------- STATIC ASSETS ----------------------
+@st.cache_resource(show_spinner=False)
+def asset_hash(path: str, mtime: float) -> str:
+    """Short content hash of a static file, computed once per file version."""
+    with open(path, "rb") as fh:
+        return hashlib.sha256(fh.read()).hexdigest()[:ASSET_HASH_LENGTH]
+
+
+def asset_url(name: str) -> str:
+    """URL of a file in static/, versioned by its content.
+
+    The hash changes whenever the file does, so browsers and proxies can
+    keep a copy for as long as they like without serving a stale one.
+    """
+    path = os.path.join(STATIC_DIR, name)
+    return f"{STATIC_URL}/{name}?v={asset_hash(path, os.path.getmtime(path))}"
+
+
+def logo_src(tenant: tenants.Tenant) -> str:
+    """The tenant's logo: a file in static/ by name, otherwise its URL as given."""
+    name = tenant.logo_url
+    if "/" not in name and os.path.isfile(os.path.join(STATIC_DIR, name)):
+        return asset_url(name)
+    return tenant.logo_url
+
+
+# ---------------------- CHROME ----------------------
+def paint() -> tenants.Tenant:
+    """Page config, CSS and header for this session's tenant."""
+    tenant = session_tenant()
+    st.set_page_config(
+        page_title=tenant.title,
+        page_icon="✅",
+        layout="wide",
+    )
+    embed_css()
+    embed_logo_html(tenant)
+    return tenant
+
+
+def embed_css() -> None:
+    # A one-line import instead of the stylesheet itself: the browser fetches
+    # app.css once per version and reruns send only this line
+    st.html(f"<style>@import url('{asset_url('app.css')}');</style>")
+
+
+def embed_logo_html(tenant: tenants.Tenant) -> None:
+    # Branding comes from the session's tenant (see tenants.py)
+    st.markdown(
+        f"""
+<a href="#main" class="skip-link">Skip to main content</a>
+<div class="goa-header">
+  <div class="goa-header-inner">
+    <img src="{html.escape(logo_src(tenant))}" alt="{html.escape(tenant.logo_alt)}" class="goa-header-logo" />
+    <div>
+      <div class="goa-header-title">{html.escape(tenant.title)}</div>
+      <div class="goa-header-subtitle">
+        {html.escape(tenant.subtitle)}
+      </div>
+    </div>
+  </div>
+</div>
+<div id="main" class="app-shell">
+""",
+        unsafe_allow_html=True,
+    )
+
+
+def close_shell() -> None:
+    st.markdown("</div>", unsafe_allow_html=True)
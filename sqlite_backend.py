@@ -0,0 +1,288 @@
+"""SQLite storage for the enriched catalogue, shared on disk between processes.
+
+With PATHFINDING_BACKEND=sqlite the app writes the enriched catalogue to
+a local SQLite file once per workbook version and keeps only a slim frame
+in memory. The file holds:
+
+* ``programs``: one row per program, keyed by row position (``pos``);
+* ``programs_fts``: an FTS5 index over each program's stemmed,
+  accent-folded words (the app's TermIndex terms), with the name,
+  organization, description and eligibility text stored alongside for
+  the fuzzy fallback;
+* ``facet_values``/``program_facets``: category membership as join tables,
+  one row per (facet, value, program).
+
+Searches return ordered row positions, and card rendering fetches only the
+rows on the page. The app expands each query word into stems, French terms
+and synonyms before querying, so both backends return the same rows. The file is rebuilt in a temporary file and swapped in
+atomically, so other processes can keep reading it while a new workbook
+version is indexed. To build it ahead of time:
+
+    python sqlite_backend.py                    # Pathfinding_Master.xlsx
+    python sqlite_backend.py other.xlsx --db other.sqlite
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+import threading
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+import pandas as pd
+
+SCHEMA_VERSION = "3"
+FTS_FIELDS = {
+    "name": "PROGRAM_NAME",
+    "organization": "ORGANIZATION",
+    "description": "DESCRIPTION",
+    "eligibility": "ELIGIBILITY",
+}
+SORT_SQL = {
+    "relevance": "pos",
+    "name": '"__sort_name" = \'\', "__sort_name", pos',
+    "checked": '"__checked" IS NULL, "__checked" DESC, pos',
+    "funding": '"__funding_max" IS NULL, "__funding_max" DESC, pos',
+}
+
+
+def default_db_path(source: str) -> str:
+    return os.path.splitext(source)[0] + ".sqlite"
+
+
+def source_stamp(source: str) -> str:
+    st = os.stat(source)
+    return f"{SCHEMA_VERSION}:{st.st_mtime_ns}:{st.st_size}"
+
+
+def is_current(db_path: str, stamp: str) -> bool:
+    if not os.path.exists(db_path):
+        return False
+    try:
+        with sqlite3.connect(f"file:{db_path}?mode=ro", uri=True) as conn:
+            row = conn.execute("SELECT value FROM meta WHERE name = 'source'").fetchone()
+    except sqlite3.Error:
+        return False
+    return row is not None and row[0] == stamp
+
+
+def write_database(
+    db_path: str,
+    df: pd.DataFrame,
+    col_map: Dict[str, str],
+    memberships: Dict[str, List[List[str]]],
+    sort_names: List[str],
+    row_terms: List[str],
+    stamp: str,
+) -> None:
+    """Write the catalogue to ``db_path``, replacing any previous file atomically."""
+    tmp_path = f"{db_path}.{os.getpid()}.tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+
+    out = df.copy()
+    for col in out.columns:
+        if isinstance(out[col].dtype, pd.CategoricalDtype):
+            out[col] = out[col].astype(object)
+    out["__checked"] = out["__checked"].dt.strftime("%Y-%m-%d")
+    out["__sort_name"] = sort_names
+    out.index.name = "pos"
+
+    conn = sqlite3.connect(tmp_path)
+    try:
+        conn.execute("PRAGMA journal_mode = OFF")
+        conn.execute("PRAGMA synchronous = OFF")
+        out.to_sql("programs", conn, index=True, dtype={"pos": "INTEGER PRIMARY KEY"})
+        conn.execute('CREATE INDEX programs_funding_max ON programs ("__funding_max")')
+
+        conn.execute(
+            "CREATE VIRTUAL TABLE programs_fts USING fts5("
+            + ", ".join(f"{name} UNINDEXED" for name in FTS_FIELDS)
+            + ", terms, tokenize = 'unicode61 remove_diacritics 2')"
+        )
+        texts = [df[col_map[key]].fillna("").astype(str).tolist() for key in FTS_FIELDS.values()]
+        conn.executemany(
+            f"INSERT INTO programs_fts(rowid, {', '.join(FTS_FIELDS)}, terms)"
+            " VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                (pos, *values, terms)
+                for pos, (values, terms) in enumerate(zip(zip(*texts), row_terms))
+            ),
+        )
+
+        conn.execute(
+            "CREATE TABLE facet_values (id INTEGER PRIMARY KEY, facet TEXT, value TEXT,"
+            " UNIQUE (facet, value))"
+        )
+        conn.execute("CREATE TABLE program_facets (value_id INTEGER, pos INTEGER)")
+        for facet, rows in memberships.items():
+            for value in sorted({v for vals in rows for v in vals}):
+                conn.execute(
+                    "INSERT INTO facet_values (facet, value) VALUES (?, ?)", (facet, value)
+                )
+            ids = dict(
+                conn.execute("SELECT value, id FROM facet_values WHERE facet = ?", (facet,))
+            )
+            conn.executemany(
+                "INSERT INTO program_facets (value_id, pos) VALUES (?, ?)",
+                ((ids[v], pos) for pos, vals in enumerate(rows) for v in vals),
+            )
+        conn.execute("CREATE INDEX program_facets_value ON program_facets (value_id, pos)")
+
+        conn.execute("CREATE TABLE meta (name TEXT PRIMARY KEY, value TEXT)")
+        conn.execute("INSERT INTO meta VALUES ('source', ?)", (stamp,))
+        conn.commit()
+    finally:
+        conn.close()
+    os.replace(tmp_path, db_path)
+
+
+def quote(term: str) -> str:
+    return '"' + term.replace('"', '""') + '"'
+
+
+def word_expression(stems: Set[str], prefix: str) -> str:
+    """One query word as an FTS5 match on the terms column: any of its stems
+    exactly, or any term starting with the word ("loan" -> terms : ("loan" OR "loan"*))."""
+    options = [quote(s) for s in sorted(stems)] + [quote(prefix) + "*"]
+    return "terms : (" + " OR ".join(options) + ")"
+
+
+class SqliteStore:
+    """Read-only access to a catalogue database; one connection per thread."""
+
+    def __init__(self, db_path: str, checked_col: str = "__checked"):
+        self.db_path = db_path
+        self.checked_col = checked_col
+        self._local = threading.local()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True)
+            self._local.conn = conn
+        return conn
+
+    def positions(
+        self,
+        words: List[Tuple[Set[str], str]],
+        filters: Dict[str, List[str]],
+        sort: str,
+        min_funding: Optional[float] = None,
+    ) -> Optional[np.ndarray]:
+        """Ordered row positions matching every query word and the filter selections.
+
+        ``words`` holds each query word as (stems, prefix). None when some
+        word matches no indexed term at all; the caller then falls back to
+        fuzzy matching.
+        """
+        where: List[str] = []
+        args: List[object] = []
+
+        conn = self._conn()
+        exprs = [word_expression(stems, prefix) for stems, prefix in words]
+        for expr in exprs:
+            found = conn.execute(
+                "SELECT 1 FROM programs_fts WHERE programs_fts MATCH ? LIMIT 1", (expr,)
+            ).fetchone()
+            if found is None:
+                return None
+        if exprs:
+            where.append("pos IN (SELECT rowid FROM programs_fts WHERE programs_fts MATCH ?)")
+            args.append(" AND ".join(exprs))
+
+        # Any value within a facet, every facet with a selection
+        for facet, values in filters.items():
+            if not values:
+                continue
+            marks = ", ".join("?" * len(values))
+            where.append(
+                "pos IN (SELECT pf.pos FROM program_facets pf"
+                " JOIN facet_values fv ON fv.id = pf.value_id"
+                f" WHERE fv.facet = ? AND fv.value IN ({marks}))"
+            )
+            args.extend([facet, *values])
+
+        if min_funding is not None:
+            where.append('"__funding_max" >= ?')
+            args.append(min_funding)
+
+        sql = "SELECT pos FROM programs"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY " + SORT_SQL.get(sort, SORT_SQL["relevance"])
+        rows = conn.execute(sql, args).fetchall()
+        return np.fromiter((r[0] for r in rows), dtype=np.int64, count=len(rows))
+
+    def rows(self, positions: np.ndarray) -> pd.DataFrame:
+        """Rows at ``positions``, in that order, with the in-memory column names."""
+        wanted = [int(p) for p in positions]
+        if not wanted:
+            frame = pd.read_sql_query(
+                "SELECT * FROM programs LIMIT 0", self._conn(), index_col="pos"
+            )
+        else:
+            marks = ", ".join("?" * len(wanted))
+            frame = pd.read_sql_query(
+                f"SELECT * FROM programs WHERE pos IN ({marks})",
+                self._conn(),
+                params=wanted,
+                index_col="pos",
+            ).reindex(wanted)
+        frame[self.checked_col] = pd.to_datetime(frame[self.checked_col])
+        return frame.drop(columns="__sort_name")
+
+    def row(self, pos: int) -> pd.Series:
+        return self.rows(np.asarray([pos])).iloc[0]
+
+    def texts(self) -> List[List[str]]:
+        """Name, organization, description and eligibility of every row, by position."""
+        rows = self._conn().execute(
+            f"SELECT {', '.join(FTS_FIELDS)} FROM programs_fts ORDER BY rowid"
+        ).fetchall()
+        return [list(col) for col in zip(*rows)] if rows else [[] for _ in FTS_FIELDS]
+
+
+def open_store(
+    source: str,
+    df: pd.DataFrame,
+    col_map: Dict[str, str],
+    memberships: Dict[str, List[List[str]]],
+    sort_names: List[str],
+    row_terms: List[str],
+    db_path: Optional[str] = None,
+) -> SqliteStore:
+    """Store for ``source``, writing the database first if it is missing or stale."""
+    db_path = db_path or default_db_path(source)
+    stamp = source_stamp(source)
+    if not is_current(db_path, stamp):
+        write_database(db_path, df, col_map, memberships, sort_names, row_terms, stamp)
+    return SqliteStore(db_path)
+
+
+def main(argv: List[str]) -> int:
+    import app
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("path", nargs="?", default="Pathfinding_Master.xlsx")
+    parser.add_argument("--db", default=None)
+    args = parser.parse_args(argv)
+
+    db_path = args.db or default_db_path(args.path)
+    df, col_map = app.load_data(args.path)
+    write_database(
+        db_path,
+        df,
+        col_map,
+        app.facet_memberships(df, app.build_facets(df, col_map)),
+        [app.collation_key(v) for v in df[col_map["PROGRAM_NAME"]]],
+        [" ".join(sorted(terms)) for terms in app.row_terms(df, col_map)],
+        source_stamp(args.path),
+    )
+    print(f"{len(df)} programs -> {db_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,94 @@
+"""Tenants: branded, filtered views of the one shared catalogue.
+
+A single app process can serve several variants of the finder, for example
+one per region or partner organization. Each tenant is a predicate over
+the catalogue plus its own branding; the workbook, its indexes and the
+result cache are loaded once and shared. At query time the tenant's base
+row mask is ANDed into every search, so a tenant costs one boolean per
+program rather than a copy of the catalogue.
+
+Tenants are read once per process from PATHFINDING_TENANTS (default
+tenants.json), a JSON object keyed by tenant id; see tenants.example.json.
+A session picks its tenant from the ``tenant`` URL parameter, then from
+the request's host name, then from PATHFINDING_TENANT. Without a match it
+gets the full catalogue with the default branding.
+"""
+
+import json
+import os
+from dataclasses import dataclass, fields
+from typing import Dict, Optional, Tuple
+
+TENANTS_FILE = os.environ.get("PATHFINDING_TENANTS", "tenants.json")
+DEFAULT_TENANT_ID = os.environ.get("PATHFINDING_TENANT", "")
+
+
+@dataclass(frozen=True)
+class Tenant:
+    """One variant of the app.
+
+    ``filters`` uses the page URL's filter parameters ("region=Calgary&
+    audience=Youth+and+Students"); ``organizations`` keeps only programs
+    run by those organizations (case-insensitive). Both must match.
+    ``logo_url`` is either the name of a file in static/, served from
+    this app, or a full URL.
+    """
+
+    id: str = ""
+    title: str = "Small Business Supports Finder"
+    subtitle: str = (
+        "Helping Alberta entrepreneurs and small businesses find programs, "
+        "funding, and services quickly."
+    )
+    logo_url: str = "GoA-logo.svg"
+    logo_alt: str = "Government of Alberta"
+    filters: str = ""
+    organizations: Tuple[str, ...] = ()
+    hosts: Tuple[str, ...] = ()
+
+    @property
+    def is_filtered(self) -> bool:
+        return bool(self.filters or self.organizations)
+
+
+DEFAULT_TENANT = Tenant()
+
+
+def parse_tenants(config: Dict[str, dict]) -> Dict[str, Tenant]:
+    """Tenants from a parsed config object; unknown settings are an error."""
+    known = {f.name for f in fields(Tenant)} - {"id"}
+    tenants: Dict[str, Tenant] = {}
+    for tenant_id, settings in config.items():
+        unknown = set(settings) - known
+        if unknown:
+            raise ValueError(f"Tenant '{tenant_id}': unknown settings {sorted(unknown)}")
+        values = dict(settings)
+        for name in ("organizations", "hosts"):
+            if name in values:
+                values[name] = tuple(values[name])
+        tenants[tenant_id] = Tenant(id=tenant_id, **values)
+    return tenants
+
+
+def load_tenants(path: str = TENANTS_FILE) -> Dict[str, Tenant]:
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as fh:
+        return parse_tenants(json.load(fh))
+
+
+def resolve_tenant(
+    tenants: Dict[str, Tenant],
+    requested: Optional[str] = None,
+    host: Optional[str] = None,
+    default_id: str = DEFAULT_TENANT_ID,
+) -> Tenant:
+    """Tenant for a session: URL parameter, then host name, then the default."""
+    if requested in tenants:
+        return tenants[requested]
+    if host:
+        name = host.split(":")[0].lower()
+        for tenant in tenants.values():
+            if name in (h.lower() for h in tenant.hosts):
+                return tenant
+    return tenants.get(default_id, DEFAULT_TENANT)
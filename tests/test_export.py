@@ -0,0 +1,36 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+from streamlit.elements.widgets.button import convert_data_to_bytes_and_infer_mime
+
+import export
+
+COLS = {key: key.lower() for _label, key in export.EXPORT_COLUMNS}
+
+
+def frame(n: int) -> pd.DataFrame:
+    return pd.DataFrame(
+        {col: [f"{col} {i} é" for i in range(n)] for col in COLS.values()}
+    )
+
+
+@pytest.mark.parametrize("fmt", list(export.EXPORT_FORMATS))
+def test_download_button_accepts_export(fmt):
+    df = frame(5)
+    data = export.export_results(lambda p: df.iloc[p], COLS, np.arange(5), fmt)
+    payload, _mime = convert_data_to_bytes_and_infer_mime(
+        data, unsupported_error=TypeError("unsupported")
+    )
+    assert payload == data and len(payload) > 0
+
+
+def test_json_keeps_position_order_across_chunks():
+    df = frame(2500)
+    positions = np.arange(2500)[::-1]
+    data = export.export_results(lambda p: df.iloc[p], COLS, positions, "JSON")
+    rows = json.loads(data.decode("utf-8"))
+    assert len(rows) == 2500
+    assert rows[0]["Program Name"] == "program_name 2499 é"
+    assert rows[-1]["Key"] == "key 0 é"
@@ -0,0 +1,37 @@
+import favourites
+
+
+def test_toggle_persists_after_flush(tmp_path):
+    path = str(tmp_path / "fav.sqlite")
+    store = favourites.FavouriteStore(path)
+    assert store.toggle("u1", "a") is True
+    assert store.toggle("u1", "b") is True
+    assert store.toggle("u1", "a") is False
+    store.flush()
+
+    reloaded = favourites.FavouriteStore(path)
+    assert reloaded.keys("u1") == {"b"}
+    assert reloaded.keys("u2") == frozenset()
+
+
+def test_new_user_needs_no_read(tmp_path, monkeypatch):
+    store = favourites.FavouriteStore(str(tmp_path / "fav.sqlite"))
+
+    def fail(user):
+        raise AssertionError("read a freshly minted user")
+
+    monkeypatch.setattr(store, "_read", fail)
+    user = store.new_user()
+    assert len(user) == 32
+    assert not store.is_saved(user, "a")
+
+
+def test_evicted_user_keeps_unwritten_changes(tmp_path):
+    store = favourites.FavouriteStore(str(tmp_path / "fav.sqlite"), cache_users=1)
+    store.toggle("u1", "a")
+    store.toggle("u2", "b")  # evicts u1 before anything is written
+    assert store.keys("u1") == {"a"}
+    store.flush()
+    store.toggle("u2", "c")
+    assert store.keys("u1") == {"a"}
+    assert store.keys("u2") == {"b", "c"}
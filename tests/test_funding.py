@@ -0,0 +1,49 @@
+import math
+
+import pytest
+
+from app import parse_funding
+
+NAN = math.nan
+
+# text, min, max, pct, per_year, currency
+CASES = [
+    ("up to $50,000", NAN, 50000, NAN, False, "CAD"),
+    ("$25,000", 25000, 25000, NAN, False, "CAD"),
+    ("$1,000 - $25,000 per year", 1000, 25000, NAN, True, "CAD"),
+    ("$1,000 to $25,000 annually", 1000, 25000, NAN, True, "CAD"),
+    ("2.5 million", 2.5e6, 2.5e6, NAN, False, "CAD"),
+    ("Up to $2.5M", NAN, 2.5e6, NAN, False, "CAD"),
+    ("30% of eligible costs", NAN, NAN, 30, False, ""),
+    ("30 of eligible costs", NAN, NAN, 30, False, ""),
+    ("1,00025,000", 1000, 25000, NAN, False, "CAD"),
+    ("Up to 50% of costs to a maximum of $100,000", NAN, 100000, 50, False, "CAD"),
+    ("maximum $2,000", NAN, 2000, NAN, False, "CAD"),
+    ("capped at $5,000", NAN, 5000, NAN, False, "CAD"),
+    ("a cap of $10,000", NAN, 10000, NAN, False, "CAD"),
+    ("no more than $7,500", NAN, 7500, NAN, False, "CAD"),
+    ("US$20,000", 20000, 20000, NAN, False, "USD"),
+    ("Funding since 2019", NAN, NAN, NAN, False, ""),
+    ("", NAN, NAN, NAN, False, ""),
+]
+
+
+def same(actual: float, expected: float) -> bool:
+    if math.isnan(expected):
+        return math.isnan(actual)
+    return actual == pytest.approx(expected)
+
+
+@pytest.mark.parametrize("text, lo, hi, pct, per_year, currency", CASES)
+def test_parse_funding(text, lo, hi, pct, per_year, currency):
+    terms = parse_funding(text)
+    assert same(terms.min, lo)
+    assert same(terms.max, hi)
+    assert same(terms.pct, pct)
+    assert terms.per_year is per_year
+    assert terms.currency == currency
+
+
+def test_parse_funding_missing_cell():
+    terms = parse_funding(NAN)
+    assert math.isnan(terms.max) and math.isnan(terms.min)
@@ -0,0 +1,49 @@
+import os
+
+import pytest
+
+import app
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+WORKBOOK = os.path.join(ROOT, "Pathfinding_Master.xlsx")
+QUERIES = [
+    "developpement", "prêt", "microloan", "small business loan", "femme entrepreneur",
+    "tax credit", "funding", "support", "business support", "start-up", "bussiness",
+    "the", "a", "xyzzyq",
+]
+
+
+@pytest.fixture(scope="module")
+def catalogues(tmp_path_factory):
+    """The workbook loaded with each storage backend."""
+    if not os.path.exists(WORKBOOK):
+        pytest.skip("workbook not available")
+    mp = pytest.MonkeyPatch()
+    mp.setattr(app, "STORAGE_BACKEND", "memory")
+    memory = app.load_catalogue(WORKBOOK, 1.0)
+    mp.setattr(app, "STORAGE_BACKEND", "sqlite")
+    mp.setattr(app, "SQLITE_DB", str(tmp_path_factory.mktemp("db") / "catalogue.sqlite"))
+    sqlite = app.load_catalogue(WORKBOOK, 2.0)
+    mp.undo()
+    yield memory, sqlite
+    app.load_catalogue.clear()
+
+
+@pytest.mark.parametrize("query", QUERIES)
+@pytest.mark.parametrize("filters", [{}, {"filter_region": ["Calgary"]}])
+def test_backends_return_the_same_programs(catalogues, query, filters):
+    memory, sqlite = catalogues
+    expected = app.find_results(memory, query, filters, "relevance", search=app.query_mask)
+    actual = app.find_results(sqlite, query, filters, "relevance", search=app.query_mask)
+    assert actual.tolist() == expected.tolist()
+
+
+def test_support_is_not_a_funding_synonym(catalogues):
+    # "support" is in the "Funding and Financial Supports" label, but must
+    # only find programs that mention it
+    memory, _sqlite = catalogues
+    terms = app.row_terms(memory.df, memory.cols)
+    found = app.find_results(memory, "support", {}, "relevance", search=app.query_mask)
+    assert len(found) > 0
+    for pos in found:
+        assert any(term.startswith("support") for term in terms[pos]), pos
@@ -0,0 +1,16 @@
+from types import SimpleNamespace
+
+import numpy as np
+
+import app
+
+
+def test_search_cache_is_per_workbook_version(monkeypatch):
+    # Same row count, different workbook: the cached mask must not be reused
+    monkeypatch.setattr(app, "query_mask", lambda catalogue, q, cancel: catalogue.mask)
+    app.st.session_state.pop("_search_cache", None)
+    old = SimpleNamespace(df=[0, 1], mtime=1.0, mask=np.array([True, False]))
+    new = SimpleNamespace(df=[0, 1], mtime=2.0, mask=np.array([False, True]))
+    assert app.search_mask(old, "loan").tolist() == [True, False]
+    assert app.search_mask(new, "loan").tolist() == [False, True]
+    assert app.search_mask(new, "loan") is new.mask
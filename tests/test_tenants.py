@@ -0,0 +1,33 @@
+from types import SimpleNamespace
+from urllib.parse import parse_qs
+
+import pytest
+
+import app
+import tenants
+
+
+def catalogue():
+    vocab = {"filter_region": ["Calgary", "Edmonton"], "filter_audience": ["Youth"]}
+    facets = {key: SimpleNamespace(vocab=vocab.get(key, [])) for key in app.URL_FILTER_PARAMS}
+    return SimpleNamespace(facets=facets, tenant_bases={})
+
+
+@pytest.mark.parametrize(
+    "filters, unknown",
+    [
+        ("region=Calgary&audience=Youth", []),
+        ("region=Calgary&region=Edmonton&min_funding=5000", []),
+        ("region=Calgry", ["region=Calgry"]),
+        ("regoin=Calgary", ["regoin=Calgary"]),
+        ("region=Calgary&min_funding=lots", ["min_funding=lots"]),
+    ],
+)
+def test_unknown_filter_params(filters, unknown):
+    assert app.unknown_filter_params(parse_qs(filters), catalogue()) == unknown
+
+
+def test_tenant_with_unknown_filter_is_an_error():
+    tenant = tenants.Tenant(id="calgary", filters="region=Calgry")
+    with pytest.raises(ValueError, match="region=Calgry"):
+        app.tenant_base(catalogue(), tenant)
@@ -0,0 +1,168 @@
+"""Summarize the usage event log written by the app (see analytics.py).
+
+Run from the repository root:
+
+    python usage_report.py                      # usage_events.jsonl
+    python usage_report.py events.jsonl --top 20
+    python usage_report.py --warmup 50 > warmup_queries.txt
+
+The report ranks search queries, filter combinations, filter pills, the
+programs shown most often and the views behind slow reruns. ``--warmup N`` prints the N most requested
+result views instead, one canonical query string per line, in the format
+the app's cache warm-up reads.
+"""
+
+import argparse
+import json
+import sys
+from collections import Counter, defaultdict
+from typing import Dict, Iterator, List, Set, Tuple
+from urllib.parse import parse_qsl, urlencode
+
+from analytics import ANALYTICS_FILE
+
+
+def read_events(path: str) -> Iterator[dict]:
+    with open(path, encoding="utf-8") as fh:
+        for line in fh:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                continue  # a line cut short by a crash mid-write
+
+
+def filter_combination(params: str) -> str:
+    """The filter part of a result key, without search text, sort or similar."""
+    pairs = [(k, v) for k, v in parse_qsl(params) if k not in ("q", "sort", "similar")]
+    return urlencode(pairs)
+
+
+def summarize(path: str) -> Dict[str, object]:
+    queries: Counter = Counter()
+    query_results: Dict[str, List[int]] = defaultdict(list)
+    query_sessions: Dict[str, Set[str]] = defaultdict(set)
+    combinations: Counter = Counter()
+    views: Counter = Counter()
+    pills: Counter = Counter()
+    impressions: Counter = Counter()
+    slow: Dict[str, List[int]] = defaultdict(list)
+    sessions: Set[str] = set()
+    total = 0
+
+    for event in read_events(path):
+        total += 1
+        kind = event.get("event")
+        sessions.add(event.get("session", ""))
+        if kind == "search":
+            params = event.get("params", "")
+            views[params] += 1
+            q = event.get("q", "")
+            if q:
+                queries[q] += 1
+                query_results[q].append(int(event.get("results", 0)))
+                query_sessions[q].add(event.get("session", ""))
+            combo = filter_combination(params)
+            if combo:
+                combinations[combo] += 1
+        elif kind == "filter" and event.get("on"):
+            pills[(event.get("filter", ""), event.get("value", ""))] += 1
+        elif kind == "impressions":
+            impressions.update(event.get("keys", []))
+        elif kind == "slow_rerun":
+            slow[event.get("params", "")].append(int(event.get("ms", 0)))
+
+    return {
+        "events": total,
+        "sessions": len(sessions - {""}),
+        "queries": queries,
+        "query_results": query_results,
+        "query_sessions": query_sessions,
+        "combinations": combinations,
+        "views": views,
+        "pills": pills,
+        "impressions": impressions,
+        "slow": slow,
+    }
+
+
+def print_table(title: str, header: Tuple[str, ...], rows: List[Tuple]) -> None:
+    print(f"\n{title}")
+    if not rows:
+        print("  (none)")
+        return
+    table = [tuple(str(c) for c in header)] + [tuple(str(c) for c in r) for r in rows]
+    widths = [max(len(r[i]) for r in table) for i in range(len(header))]
+    for r in table:
+        print("  " + "  ".join(c.ljust(w) for c, w in zip(r, widths)).rstrip())
+
+
+def print_report(summary: Dict[str, object], top: int) -> None:
+    print(f"{summary['events']} events from {summary['sessions']} sessions")
+
+    queries: Counter = summary["queries"]
+    results = summary["query_results"]
+    sessions = summary["query_sessions"]
+    print_table(
+        "Top search queries",
+        ("count", "sessions", "avg results", "zero results", "query"),
+        [
+            (
+                n,
+                len(sessions[q]),
+                round(sum(results[q]) / len(results[q]), 1),
+                sum(1 for r in results[q] if r == 0),
+                q,
+            )
+            for q, n in queries.most_common(top)
+        ],
+    )
+    print_table(
+        "Top filter combinations",
+        ("count", "filters"),
+        [(n, combo) for combo, n in summary["combinations"].most_common(top)],
+    )
+    print_table(
+        "Top filter pills",
+        ("count", "filter", "value"),
+        [(n, f, v) for (f, v), n in summary["pills"].most_common(top)],
+    )
+    print_table(
+        "Most shown programs",
+        ("impressions", "key"),
+        [(n, key) for key, n in summary["impressions"].most_common(top)],
+    )
+    slow = summary["slow"]
+    print_table(
+        "Slow reruns (see profiling.py)",
+        ("count", "max ms", "params"),
+        sorted(
+            ((len(ms), max(ms), params or "(no search or filters)") for params, ms in slow.items()),
+            reverse=True,
+        )[:top],
+    )
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("path", nargs="?", default=ANALYTICS_FILE)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--warmup", type=int, default=0, metavar="N")
+    args = parser.parse_args(argv)
+
+    summary = summarize(args.path)
+    if args.warmup:
+        views: Counter = summary["views"]
+        popular = [p for p, _n in views.most_common() if p and "similar" not in dict(parse_qsl(p))]
+        for params in popular[: args.warmup]:
+            print(params)
+        return 0
+
+    print_report(summary, args.top)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))